@@ -0,0 +1,6 @@
+"""
+Shared tooling for the 2024 solutions. Run from the 2024 directory with
+
+    python -m aoc run --day 16 --input input
+"""
+from aoc.runner import Day, PartResult, available_days, load_module, run_day
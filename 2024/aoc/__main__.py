@@ -0,0 +1,221 @@
+import argparse
+import sys
+from pathlib import Path
+
+from aoc import bench, cache, generate, pool
+from aoc.memory import MemoryTracker, parse_budgets
+from aoc.profiling import MODES, PROFILE_DIR, Profiler
+from aoc.runner import PARTS, available_days, run_day, supports_streaming
+
+
+def streaming_days(days: list[int]) -> list[int]:
+    supported = [day for day in days if supports_streaming(day)]
+    for day in days:
+        if day not in supported:
+            print(f"des{day}: skipped (no streaming parser)")
+
+    return supported
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    days = args.day or available_days()
+
+    if args.stream and args.cache:
+        print("--stream can't be combined with --cache", file=sys.stderr)
+        return 2
+
+    if args.stream:
+        days = streaming_days(days)
+
+    if args.jobs != 1 and args.profile:
+        print("--profile can't be combined with --jobs", file=sys.stderr)
+        return 2
+
+    track_memory = args.memory or bool(args.memory_budget)
+    if args.jobs != 1 and track_memory:
+        print("--memory and --memory-budget can't be combined with --jobs", file=sys.stderr)
+        return 2
+
+    try:
+        budgets = parse_budgets(args.memory_budget or [])
+    except ValueError:
+        print(f"Invalid --memory-budget {args.memory_budget}", file=sys.stderr)
+        return 2
+
+    if args.jobs != 1:
+        results, wall_time = pool.run_all(days, args.input, jobs=args.jobs or None,
+                                          split_parts=args.split_parts,
+                                          timeout=args.timeout,
+                                          use_cache=args.cache,
+                                          stream=args.stream)
+        print(pool.format_summary(results, wall_time))
+        return 1 if any(result.error is not None for result in results) else 0
+
+    failed = False
+    for day in days:
+        profiler = None
+        if args.profile:
+            profiler = Profiler(args.profile, args.profile_dir / f"des{day}",
+                                tag=args.profile_tag, interval=args.sample_interval)
+
+        memory = None
+        if track_memory:
+            memory = MemoryTracker(top=args.memory_top, budgets=budgets)
+
+        try:
+            results = run_day(day, args.input, verbose=args.verbose, use_cache=args.cache,
+                              stream=args.stream, profiler=profiler, memory=memory)
+        except FileNotFoundError as e:
+            print(f"des{day}: skipped ({e})")
+            continue
+
+        for result in results:
+            print(result)
+            failed = failed or result.error is not None
+
+    return 1 if failed else 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    days = args.day or available_days()
+
+    if args.repeat < 1 or args.warmup < 0:
+        print("--repeat must be at least 1 and --warmup can't be negative", file=sys.stderr)
+        return 2
+
+    if args.stream and args.cache:
+        print("--stream can't be combined with --cache", file=sys.stderr)
+        return 2
+
+    if args.stream:
+        days = streaming_days(days)
+
+    results = bench.benchmark(days, args.input, repeat=args.repeat, warmup=args.warmup,
+                              parts=args.part or PARTS, use_cache=args.cache,
+                              stream=args.stream)
+    print(bench.format_table(results))
+
+    if args.json:
+        bench.save_results(results, args.json)
+
+    if args.baseline:
+        baseline = bench.load_results(args.baseline)
+        regressions = bench.compare(results, baseline, tolerance=args.tolerance,
+                                    metric=args.metric)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+def cmd_clear_cache(args: argparse.Namespace) -> int:
+    count = cache.clear()
+    print(f"Removed {count} cached inputs from {cache.CACHE_DIR}")
+    return 0
+
+
+def cmd_generate(args: argparse.Namespace) -> int:
+    days = args.day or sorted(generate.GENERATORS)
+
+    if args.output is not None and len(days) > 1:
+        print("--output can only be used with a single --day", file=sys.stderr)
+        return 2
+
+    for day in days:
+        if day not in generate.GENERATORS:
+            print(f"des{day}: skipped (no input generator)")
+            continue
+
+        path = generate.write_input(day, args.scale, args.seed, args.output)
+        print(f"des{day}: wrote {path} ({path.stat().st_size} bytes)")
+
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m aoc")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="run days in this process")
+    run.add_argument("--day", type=int, action="append",
+                     help="day to run, can be given several times (default: all days)")
+    run.add_argument("--input", default="input",
+                     help="input file name in the day directory, or a path (default: input)")
+    run.add_argument("--verbose", action="store_true",
+                     help="show what the solvers print")
+    run.add_argument("--jobs", type=int, default=1,
+                     help="run days in this many worker processes, 0 for one per cpu (default: 1)")
+    run.add_argument("--split-parts", action="store_true",
+                     help="with --jobs, run part 1 and part 2 of a day as separate tasks")
+    run.add_argument("--timeout", type=float,
+                     help="with --jobs, wall clock limit in seconds for each task")
+    run.add_argument("--cache", action="store_true",
+                     help="load parsed inputs from the input cache, parsing and storing them on a miss")
+    run.add_argument("--stream", action="store_true",
+                     help="let the parts read the input line by line with the day's iter_file, "
+                          "only days that have one are run")
+    run.add_argument("--profile", choices=MODES,
+                     help="profile each step with cProfile or the sampling profiler")
+    run.add_argument("--profile-dir", type=Path, default=PROFILE_DIR,
+                     help="profiles are written to <dir>/des<day>/ (default: profiles)")
+    run.add_argument("--profile-tag", default="",
+                     help="prefix for the profile file names, e.g. before or after")
+    run.add_argument("--sample-interval", type=float, default=0.005,
+                     help="seconds between samples for --profile sample (default: 0.005)")
+    run.add_argument("--memory", action="store_true",
+                     help="report peak rss, tracemalloc peak and top allocation sites of each step")
+    run.add_argument("--memory-top", type=int, default=5,
+                     help="number of allocation sites to show with --memory (default: 5)")
+    run.add_argument("--memory-budget", action="append", metavar="[STEP=]SIZE",
+                     help="fail a step if its tracemalloc peak goes over SIZE, e.g. 200M or "
+                          "part2=50M, can be given several times (implies --memory)")
+    run.set_defaults(func=cmd_run)
+
+    bench_parser = subparsers.add_parser("bench", help="benchmark days")
+    bench_parser.add_argument("--day", type=int, action="append",
+                              help="day to benchmark, can be given several times (default: all days)")
+    bench_parser.add_argument("--input", default="input",
+                              help="glob pattern for the inputs in each day directory (default: input)")
+    bench_parser.add_argument("--part", choices=PARTS, action="append",
+                              help="part to benchmark, can be given several times (default: all parts)")
+    bench_parser.add_argument("--repeat", type=int, default=5,
+                              help="number of timed runs (default: 5)")
+    bench_parser.add_argument("--warmup", type=int, default=1,
+                              help="number of untimed runs before timing (default: 1)")
+    bench_parser.add_argument("--json", help="write the results as JSON to this file")
+    bench_parser.add_argument("--baseline", help="JSON results to compare against")
+    bench_parser.add_argument("--tolerance", type=float, default=0.2,
+                              help="allowed slowdown before failing, as a fraction (default: 0.2)")
+    bench_parser.add_argument("--metric", choices=["min", "median", "p95"], default="median",
+                              help="statistic to compare against the baseline (default: median)")
+    bench_parser.add_argument("--cache", action="store_true",
+                              help="load parsed inputs from the input cache, so parse times the cache")
+    bench_parser.add_argument("--stream", action="store_true",
+                              help="let the parts read the input line by line with the day's iter_file, "
+                                   "only days that have one are benchmarked")
+    bench_parser.set_defaults(func=cmd_bench)
+
+    clear_cache = subparsers.add_parser("clear-cache", help="remove all cached parsed inputs")
+    clear_cache.set_defaults(func=cmd_clear_cache)
+
+    generate_parser = subparsers.add_parser("generate", help="write synthetic inputs for scale testing")
+    generate_parser.add_argument("--day", type=int, action="append",
+                                 help="day to generate an input for, can be given several times "
+                                      "(default: all days with a generator)")
+    generate_parser.add_argument("--scale", type=float, default=1.0,
+                                 help="size relative to the puzzle input, grids scale by area (default: 1)")
+    generate_parser.add_argument("--seed", type=int, default=generate.DEFAULT_SEED,
+                                 help=f"random seed (default: {generate.DEFAULT_SEED})")
+    generate_parser.add_argument("--output", type=Path,
+                                 help="file to write, default: generated_x<scale>_s<seed> in the day directory")
+    generate_parser.set_defaults(func=cmd_generate)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,73 @@
+from collections import deque
+from typing import Iterable
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton for counting many words in one pass over a text.
+
+    The trie of the words is turned into a complete automaton, so reading a
+    character is a single dictionary lookup and never follows failure links.
+    While scanning, only the number of visits to each state is recorded.
+    Every state also ends all the words that end its failure state, so the
+    visits are pushed down the failure links afterwards, deepest states
+    first, and the word counts are read from the states the words end in.
+
+    Occurrences may overlap. Characters that aren't in any word send the
+    automaton back to the start, so several texts can be scanned as one when
+    joined by such a character.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.words = list(dict.fromkeys(words))
+        assert all(self.words), "The words can't be empty"
+
+        # Build the trie, a state is an index into these lists
+        self.delta: list[dict[str,int]] = [{}]
+        self.ends: list[int] = []
+        for word in self.words:
+            state = 0
+            for ch in word:
+                if ch not in self.delta[state]:
+                    self.delta[state][ch] = len(self.delta)
+                    self.delta.append({})
+                state = self.delta[state][ch]
+            self.ends.append(state)
+
+        # Fill in the failure links breadth first, completing each state with
+        # the moves of its failure state, which is shallower and so already
+        # complete. Only the root isn't, its missing moves go back to itself.
+        # The order is kept for counting.
+        self.fail = [0] * len(self.delta)
+        self.order: list[int] = []
+        queue = deque(self.delta[0].values())
+        while queue:
+            state = queue.popleft()
+            self.order.append(state)
+            fail_moves = self.delta[self.fail[state]]
+            for ch, nxt in self.delta[state].items():
+                self.fail[nxt] = fail_moves.get(ch, 0)
+                queue.append(nxt)
+
+            for ch, nxt in fail_moves.items():
+                self.delta[state].setdefault(ch, nxt)
+
+    def __repr__(self) -> str:
+        return f"AhoCorasick(words={len(self.words)}, states={len(self.delta)})"
+
+    def count(self, text: str) -> dict[str,int]:
+        """
+        Return:
+            The number of occurrences of each word in text
+        """
+        delta = self.delta
+        visits = [0] * len(delta)
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            visits[state] += 1
+
+        for state in reversed(self.order):
+            visits[self.fail[state]] += visits[state]
+
+        return {word: visits[end] for word, end in zip(self.words, self.ends)}
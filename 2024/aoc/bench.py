@@ -0,0 +1,176 @@
+import json
+import math
+import statistics
+from pathlib import Path
+from typing import Any
+
+from aoc.runner import Day, PARTS, day_dir, supports_streaming, timed
+
+
+def find_inputs(day: int, pattern: str) -> list[Path]:
+    """
+    Inputs are given as glob patterns relative to the day directory, so
+    "example_input*" picks up all the example inputs of a day.
+    """
+    return sorted(p for p in day_dir(day).glob(pattern) if p.is_file())
+
+
+def percentile(samples: list[float], p: float) -> float:
+    # Nearest-rank percentile, good enough for the sample sizes used here
+    ordered = sorted(samples)
+    rank = math.ceil(p / 100 * len(ordered))
+    return ordered[max(rank - 1, 0)]
+
+
+def summarize(samples: list[float]) -> dict[str,float]:
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "p95": percentile(samples, 95),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "runs": len(samples),
+    }
+
+
+def benchmark_input(day: int, filename: Path, *,
+                    repeat: int = 5, warmup: int = 1,
+                    parts: list[str] = PARTS,
+                    use_cache: bool = False,
+                    stream: bool = False) -> dict[str,dict[str,Any]]:
+    """
+    Runs parse and the given parts of a day warmup + repeat times. Parsing is
+    redone for every run since it's part of what is measured. With use_cache
+    the parse step is loading the cached input instead, and with stream the
+    parts read the input themselves so parsing is in their times.
+    Return:
+        timing statistics and the answer per part
+    """
+    assert repeat >= 1, "At least one timed run is needed for the statistics"
+    solver = Day(day, use_cache=use_cache, stream=stream)
+
+    samples = {part: [] for part in parts}
+    answers = {}
+    # Like run_day, a part that raises is recorded as failed and the others
+    # are still run. A part that failed once isn't run again.
+    errors = {}
+    for run in range(warmup + repeat):
+        try:
+            puzzle_input, elapsed = timed(solver.task("parse", filename))
+        except Exception as e:
+            # Nothing can run without the input
+            for part in parts:
+                errors.setdefault(part, repr(e))
+            break
+
+        if run >= warmup and "parse" in samples:
+            samples["parse"].append(elapsed)
+
+        for part in parts:
+            if part == "parse" or part in errors:
+                continue
+
+            try:
+                answer, elapsed = timed(solver.task(part, filename, puzzle_input))
+            except Exception as e:
+                errors[part] = repr(e)
+                continue
+
+            answers[part] = answer
+            if run >= warmup:
+                samples[part].append(elapsed)
+
+    stats = {}
+    for part in parts:
+        if part in errors:
+            stats[part] = {"error": errors[part]}
+            continue
+
+        stats[part] = summarize(samples[part])
+        if part in answers:
+            stats[part]["answer"] = str(answers[part])
+
+    return stats
+
+
+def benchmark(days: list[int], input_pattern: str = "input", *,
+              repeat: int = 5, warmup: int = 1,
+              parts: list[str] = PARTS,
+              use_cache: bool = False,
+              stream: bool = False) -> dict[str,dict[str,Any]]:
+    """
+    Benchmarks every input matching input_pattern for the given days. The
+    results are keyed on "des<day>/<input>/<part>". With stream only the
+    days with a streaming parser are benchmarked.
+    """
+    results = {}
+    for day in days:
+        if stream and not supports_streaming(day):
+            continue
+
+        for filename in find_inputs(day, input_pattern):
+            stats = benchmark_input(day, filename, repeat=repeat, warmup=warmup, parts=parts,
+                                    use_cache=use_cache, stream=stream)
+            for part, part_stats in stats.items():
+                results[f"des{day}/{filename.name}/{part}"] = part_stats
+
+    return results
+
+
+def compare(results: dict[str,dict[str,Any]], baseline: dict[str,dict[str,Any]], *,
+            tolerance: float = 0.2, metric: str = "median") -> list[str]:
+    """
+    Compares benchmark results against a stored baseline. A part is a
+    regression if it's more than tolerance (as a fraction) slower than the
+    baseline, if its answer changed, or if it failed.
+    Return:
+        a description of each regression, empty if there are none
+    """
+    regressions = []
+    for key, stats in results.items():
+        if "error" in stats:
+            regressions.append(f"{key}: failed ({stats['error']})")
+            continue
+
+        if key not in baseline:
+            continue
+
+        base = baseline[key]
+        if "error" in base:
+            # Nothing to compare the time against
+            continue
+
+        if "answer" in base and stats.get("answer") != base["answer"]:
+            regressions.append(f"{key}: answer {stats.get('answer')} != baseline {base['answer']}")
+
+        now, before = stats[metric], base[metric]
+        if now > before * (1 + tolerance):
+            change = (now / before - 1) * 100 if before > 0 else float("inf")
+            regressions.append(
+                f"{key}: {metric} {now:.4f}s vs baseline {before:.4f}s ({change:+.0f}%)")
+
+    return regressions
+
+
+def load_results(path: str | Path) -> dict[str,dict[str,Any]]:
+    with open(path) as fp:
+        return json.load(fp)
+
+
+def save_results(results: dict[str,dict[str,Any]], path: str | Path):
+    with open(path, "w") as fp:
+        json.dump(results, fp, indent=2, sort_keys=True)
+        fp.write("\n")
+
+
+def format_table(results: dict[str,dict[str,Any]]) -> str:
+    header = f"{'benchmark':<40} {'min':>10} {'median':>10} {'p95':>10} {'stdev':>10}"
+    lines = [header, "-" * len(header)]
+    for key, stats in results.items():
+        if "error" in stats:
+            lines.append(f"{key:<40} failed ({stats['error']})")
+            continue
+
+        lines.append(f"{key:<40} {stats['min']:>10.4f} {stats['median']:>10.4f} "
+                     f"{stats['p95']:>10.4f} {stats['stdev']:>10.4f}")
+
+    return "\n".join(lines)
@@ -0,0 +1,113 @@
+import hashlib
+import mmap
+import pickle
+import struct
+from pathlib import Path
+from typing import Any, Callable
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+# Cache files start with the magic, the number of out-of-band buffers and the
+# length of the pickle, followed by the offset and length of each buffer
+MAGIC = b"AOCC"
+HEADER = struct.Struct("<4sIQ")
+BUFFER_ENTRY = struct.Struct("<QQ")
+ALIGNMENT = 64
+
+
+def file_hash(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        while chunk := fp.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(name: str, filename: str | Path, version: str) -> Path:
+    key = f"{file_hash(filename)[:16]}-{version[:16]}"
+    return CACHE_DIR / f"{name}-{Path(filename).name}-{key}.bin"
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save(obj: Any, path: Path):
+    """
+    Pickles obj with protocol 5. Objects that support out-of-band buffers
+    (like Grid and NumPy arrays) are written as raw aligned bytes after the
+    pickle, so loading them is a memory map instead of a copy through the
+    unpickler.
+    """
+    buffers: list[pickle.PickleBuffer] = []
+    data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+
+    header_size = HEADER.size + BUFFER_ENTRY.size * len(buffers)
+    offset = _align(header_size + len(data))
+    entries = []
+    for buffer in buffers:
+        length = buffer.raw().nbytes
+        entries.append((offset, length))
+        offset = _align(offset + length)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as fp:
+        fp.write(HEADER.pack(MAGIC, len(buffers), len(data)))
+        for entry in entries:
+            fp.write(BUFFER_ENTRY.pack(*entry))
+        fp.write(data)
+
+        for (start, _), buffer in zip(entries, buffers):
+            fp.write(b"\0" * (start - fp.tell()))
+            fp.write(buffer.raw())
+
+    # Rename so a half written file is never read by another process
+    tmp.replace(path)
+
+
+def load(path: Path) -> Any:
+    with open(path, "rb") as fp:
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, buffer_count, data_length = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an input cache file")
+
+    view = memoryview(mm)
+    buffers = []
+    for i in range(buffer_count):
+        start, length = BUFFER_ENTRY.unpack_from(mm, HEADER.size + i * BUFFER_ENTRY.size)
+        buffers.append(view[start:start + length])
+
+    data_start = HEADER.size + BUFFER_ENTRY.size * buffer_count
+    # The map stays open as long as anything unpickled still refers to it
+    return pickle.loads(view[data_start:data_start + data_length], buffers=buffers)
+
+
+def cached_parse(name: str, filename: str | Path, parse: Callable[[str], Any],
+                 version: str) -> Any:
+    """
+    Returns the cached parsed input if there is one, otherwise parses and
+    stores it. Entries are keyed on the name of the day, the hash of the input
+    file and the parser version.
+    """
+    path = cache_path(name, filename, version)
+    if path.exists():
+        try:
+            return load(path)
+        except (ValueError, pickle.UnpicklingError, struct.error, EOFError):
+            path.unlink()
+
+    puzzle_input = parse(str(filename))
+    save(puzzle_input, path)
+    return puzzle_input
+
+
+def clear() -> int:
+    count = 0
+    for path in CACHE_DIR.glob("*.bin"):
+        path.unlink()
+        count += 1
+
+    return count
@@ -0,0 +1,509 @@
+"""
+Synthetic inputs for scale testing. Each day has a generator that writes an
+input with the same structure as the official one, scaled by a factor: a
+scale of 1 is roughly the size of the official input, and a scale of 100 is
+100 times as many lines, digits or grid cells. Grids grow by sqrt(scale) in
+both directions, so the number of cells follows the scale.
+
+Some examples:
+
+    des1  --scale 1000    10^6 lines
+    des6  --scale 237     2000 x 2000 lab
+    des9  --scale 500     10^7 digit disk map
+    des22 --scale 60      10^5 buyers
+    des20 --scale 12.6    500 x 500 racetrack
+
+The generators only use the given random.Random, so a seed always gives the
+same input.
+"""
+
+import math
+import random
+from collections import deque
+from itertools import chain
+from pathlib import Path
+from typing import Callable
+
+from aoc.runner import day_dir
+
+
+Generator = Callable[[random.Random, float], str]
+
+GENERATORS: dict[int,Generator] = {}
+DEFAULT_SEED = 2024
+
+
+def generator(day: int) -> Callable[[Generator], Generator]:
+    def register(func: Generator) -> Generator:
+        GENERATORS[day] = func
+        return func
+
+    return register
+
+
+def scaled(base: int, scale: float, minimum: int = 1) -> int:
+    return max(minimum, round(base * scale))
+
+
+def side(base: int, scale: float, minimum: int = 5) -> int:
+    """Side length of a grid whose area grows with scale."""
+    return max(minimum, round(base * math.sqrt(scale)))
+
+
+def odd(n: int) -> int:
+    return n if n % 2 == 1 else n + 1
+
+
+def lines(rows: list[str]) -> str:
+    return "\n".join(rows) + "\n"
+
+
+def random_grid(rng: random.Random, rows: int, cols: int,
+                population: str, weights: list[float] | None = None) -> list[list[str]]:
+    return [rng.choices(population, weights, k=cols) for _ in range(rows)]
+
+
+def maze(rng: random.Random, rows: int, cols: int) -> list[bytearray]:
+    """
+    A perfect maze (exactly one path between any two cells) carved with a
+    randomized depth first search. rows and cols must be odd, the cells are
+    at odd positions and everything on the border is wall.
+    """
+    cells = [bytearray(b"#" * cols) for _ in range(rows)]
+    cells[1][1] = ord(".")
+    stack = [(1, 1)]
+    while stack:
+        r, c = stack[-1]
+        options = [(r + dr, c + dc, dr, dc) for dr, dc in [(-2, 0), (0, 2), (2, 0), (0, -2)]
+                   if 0 < r + dr < rows - 1 and 0 < c + dc < cols - 1
+                   and cells[r + dr][c + dc] == ord("#")]
+        if not options:
+            stack.pop()
+            continue
+
+        rr, cc, dr, dc = rng.choice(options)
+        cells[r + dr // 2][c + dc // 2] = ord(".")
+        cells[rr][cc] = ord(".")
+        stack.append((rr, cc))
+
+    return cells
+
+
+def maze_path(cells: list[bytearray], start: tuple[int,int], end: tuple[int,int]) -> list[tuple[int,int]]:
+    came_from = {start: start}
+    queue = deque([start])
+    while queue:
+        r, c = queue.popleft()
+        if (r, c) == end:
+            break
+        for rr, cc in [(r - 1, c), (r, c + 1), (r + 1, c), (r, c - 1)]:
+            if cells[rr][cc] == ord(".") and (rr, cc) not in came_from:
+                came_from[(rr, cc)] = (r, c)
+                queue.append((rr, cc))
+
+    path = [end]
+    while path[-1] != start:
+        path.append(came_from[path[-1]])
+
+    return list(reversed(path))
+
+
+@generator(1)
+def generate_des1(rng: random.Random, scale: float) -> str:
+    n = scaled(1000, scale)
+    left = [rng.randrange(10000, 100000) for _ in range(n)]
+    # Reuse numbers from the left list on the right so part 2 has matches
+    right = [rng.choice(left) if rng.random() < 0.3 else rng.randrange(10000, 100000)
+             for _ in range(n)]
+    return lines([f"{a}   {b}" for a, b in zip(left, right)])
+
+
+@generator(2)
+def generate_des2(rng: random.Random, scale: float) -> str:
+    reports = []
+    for _ in range(scaled(1000, scale)):
+        direction = rng.choice([-1, 1])
+        levels = [rng.randrange(10, 90)]
+        for _ in range(rng.randrange(4, 8)):
+            levels.append(levels[-1] + direction * rng.randrange(1, 4))
+
+        # Break about half of the reports, some of them twice
+        for _ in range(rng.choice([0, 0, 1, 1, 2])):
+            i = rng.randrange(len(levels))
+            levels[i] += rng.choice([-4, -2, 0, 2, 5])
+
+        reports.append(" ".join(str(level) for level in levels))
+
+    return lines(reports)
+
+
+@generator(3)
+def generate_des3(rng: random.Random, scale: float) -> str:
+    noise = "!@#$%^&*()[]{}<>?;:'+-~ ,"
+    junk = ["why()", "what()", "how()", "who()", "where()", "from()", "select()",
+            "mul[3,7]", "mul(4*", "mul ( 2 , 4 )", "mul(1234,5)", "mul(6,9!", "do_not_mul(5,5)"]
+
+    chunks = []
+    length = 0
+    target = scaled(20000, scale)
+    while length < target:
+        roll = rng.random()
+        if roll < 0.2:
+            chunk = f"mul({rng.randrange(1, 1000)},{rng.randrange(1, 1000)})"
+        elif roll < 0.23:
+            chunk = rng.choice(["do()", "don't()"])
+        elif roll < 0.4:
+            chunk = rng.choice(junk)
+        else:
+            chunk = "".join(rng.choices(noise, k=rng.randrange(1, 4)))
+        chunks.append(chunk)
+        length += len(chunk)
+
+    memory = "".join(chunks)
+    line_length = math.ceil(len(memory) / 6)
+    return lines([memory[i:i + line_length] for i in range(0, len(memory), line_length)])
+
+
+@generator(4)
+def generate_des4(rng: random.Random, scale: float) -> str:
+    n = side(140, scale)
+    return lines(["".join(row) for row in random_grid(rng, n, n, "XMAS")])
+
+
+@generator(5)
+def generate_des5(rng: random.Random, scale: float) -> str:
+    # Pages are ordered by a hidden permutation. Every pair of pages closer
+    # than window in it has a rule, and the pages of an update are always
+    # within a window, so every update can be sorted by the rules. At scale 1
+    # this is every pair of 49 pages, like the puzzle.
+    window = 49
+    count = scaled(49, scale, window)
+    pages = rng.sample(range(10, 10 + count), count)
+    position = {page: i for i, page in enumerate(pages)}
+
+    rules = []
+    for i, a in enumerate(pages):
+        for b in pages[i + 1:i + window]:
+            rules.append(f"{a}|{b}")
+    rng.shuffle(rules)
+
+    updates = []
+    for _ in range(scaled(190, scale)):
+        start = rng.randrange(len(pages) - window + 1)
+        update = rng.sample(pages[start:start + window], odd(rng.randrange(5, 23)))
+        if rng.random() < 0.5:
+            update.sort(key=lambda page: position[page])
+        updates.append(update)
+
+    return "\n".join(rules) + "\n\n" + lines([",".join(str(p) for p in u) for u in updates])
+
+
+@generator(6)
+def generate_des6(rng: random.Random, scale: float) -> str:
+    n = side(130, scale)
+    grid = random_grid(rng, n, n, ".#", [0.952, 0.048])
+    while True:
+        start = rng.randrange(n), rng.randrange(n)
+        if grid[start[0]][start[1]] == ".":
+            break
+
+    # The guard has to leave the lab, so walk the route and remove the
+    # obstacle where it starts repeating itself until it does
+    while (obstacle := find_loop(grid, start)) is not None:
+        grid[obstacle[0]][obstacle[1]] = "."
+
+    grid[start[0]][start[1]] = "^"
+    return lines(["".join(row) for row in grid])
+
+
+def find_loop(grid: list[list[str]], start: tuple[int,int]) -> tuple[int,int] | None:
+    """The obstacle where the guard turns the same way twice, None if it leaves."""
+    n = len(grid)
+    (r, c), d = start, 0
+    turns = set()
+    while True:
+        dr, dc = [(-1, 0), (0, 1), (1, 0), (0, -1)][d]
+        rr, cc = r + dr, c + dc
+        if not (0 <= rr < n and 0 <= cc < n):
+            return None
+
+        if grid[rr][cc] == "#":
+            if (r, c, d) in turns:
+                return rr, cc
+            turns.add((r, c, d))
+            d = (d + 1) % 4
+        else:
+            r, c = rr, cc
+
+
+@generator(7)
+def generate_des7(rng: random.Random, scale: float) -> str:
+    # Same distribution of equation lengths and number sizes as the puzzle
+    lengths = range(3, 13)
+    length_weights = [16, 15, 240, 127, 94, 90, 77, 76, 59, 56]
+
+    equations = []
+    for _ in range(scaled(850, scale)):
+        length = rng.choices(lengths, length_weights)[0]
+        digits = rng.choices([1, 2, 3], [3293, 1651, 1278], k=length)
+        numbers = [rng.randrange(1 if d == 1 else 10 ** (d - 1), 10 ** d) for d in digits]
+
+        value = numbers[0]
+        for number in numbers[1:]:
+            op = rng.choice("+*|")
+            if op == "+":
+                value += number
+            elif op == "*":
+                value *= number
+            else:
+                value = int(f"{value}{number}")
+
+        # About a third can't be made true
+        if rng.random() < 0.35:
+            value += rng.randrange(1, 100)
+
+        equations.append(f"{value}: " + " ".join(str(n) for n in numbers))
+
+    return lines(equations)
+
+
+@generator(8)
+def generate_des8(rng: random.Random, scale: float) -> str:
+    n = side(50, scale)
+    frequencies = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    grid = [["."] * n for _ in range(n)]
+    for _ in range(min(scaled(224, scale), n * n // 4)):
+        r, c = rng.randrange(n), rng.randrange(n)
+        grid[r][c] = rng.choice(frequencies)
+
+    return lines(["".join(row) for row in grid])
+
+
+@generator(9)
+def generate_des9(rng: random.Random, scale: float) -> str:
+    files = scaled(10000, scale)
+    file_sizes = rng.choices("123456789", k=files)
+    free_sizes = rng.choices("0123456789", k=files - 1)
+    return "".join(chain.from_iterable(zip(file_sizes, free_sizes))) + file_sizes[-1] + "\n"
+
+
+@generator(10)
+def generate_des10(rng: random.Random, scale: float) -> str:
+    # Random heights with hiking trails drawn on top, a random walk from a 0
+    # to a 9. Later trails can cut through earlier ones.
+    n = side(41, scale)
+    grid = [[rng.randrange(10) for _ in range(n)] for _ in range(n)]
+
+    for _ in range(scaled(250, scale)):
+        r, c = rng.randrange(n), rng.randrange(n)
+        trail = [(r, c)]
+        while len(trail) < 10:
+            r, c = trail[-1]
+            options = [(rr, cc) for rr, cc in [(r - 1, c), (r, c + 1), (r + 1, c), (r, c - 1)]
+                       if 0 <= rr < n and 0 <= cc < n and (rr, cc) not in trail]
+            if not options:
+                break
+            trail.append(rng.choice(options))
+
+        if len(trail) == 10:
+            for height, (r, c) in enumerate(trail):
+                grid[r][c] = height
+
+    return lines(["".join(str(height) for height in row) for row in grid])
+
+
+@generator(11)
+def generate_des11(rng: random.Random, scale: float) -> str:
+    stones = [rng.choice([rng.randrange(10), rng.randrange(10**7)]) for _ in range(scaled(8, scale))]
+    return " ".join(str(stone) for stone in stones) + "\n"
+
+
+@generator(12)
+def generate_des12(rng: random.Random, scale: float) -> str:
+    # Letters of a coarse grid of blocks, with every cell looking up its block
+    # with a small random offset to make ragged region borders
+    n = side(140, scale)
+    block = 8
+    coarse = random_grid(rng, n // block + 2, n // block + 2, "ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+    rows = []
+    for r in range(n):
+        row = []
+        for c in range(n):
+            row.append(coarse[(r + rng.randrange(4)) // block][(c + rng.randrange(4)) // block])
+        rows.append("".join(row))
+
+    return lines(rows)
+
+
+@generator(13)
+def generate_des13(rng: random.Random, scale: float) -> str:
+    machines = []
+    for _ in range(scaled(320, scale)):
+        ax, ay, bx, by = [rng.randrange(10, 100) for _ in range(4)]
+        if ax * by == ay * bx:
+            # The puzzle never has parallel buttons
+            continue
+
+        if rng.random() < 0.5:
+            a, b = rng.randrange(101), rng.randrange(101)
+            px, py = a * ax + b * bx, a * ay + b * by
+        else:
+            px, py = rng.randrange(1000, 20000), rng.randrange(1000, 20000)
+
+        machines.append(f"Button A: X+{ax}, Y+{ay}\nButton B: X+{bx}, Y+{by}\nPrize: X={px}, Y={py}\n")
+
+    return "\n".join(machines)
+
+
+@generator(14)
+def generate_des14(rng: random.Random, scale: float) -> str:
+    # Part 1 splits the room in quadrants around the middle, so keep it odd
+    w = odd(side(101, scale))
+    h = odd(side(103, scale))
+
+    robots = []
+    for _ in range(scaled(500, scale)):
+        vx, vy = rng.randrange(-w + 1, w), rng.randrange(-h + 1, h)
+        robots.append([rng.randrange(w), rng.randrange(h), vx, vy])
+
+    # Line up some robots in a row after a random number of seconds, which is
+    # what part 2 looks for. Work backwards from where they should end up.
+    seconds = rng.randrange(1, min(w * h, 10000))
+    y = rng.randrange(h)
+    x0 = rng.randrange(max(1, w - 31))
+    for i, robot in enumerate(robots[:min(31, w, len(robots))]):
+        _, _, vx, vy = robot
+        robot[0] = (x0 + i - vx * seconds) % w
+        robot[1] = (y - vy * seconds) % h
+
+    return lines([f"w={w} h={h}"] + [f"p={px},{py} v={vx},{vy}" for px, py, vx, vy in robots])
+
+
+@generator(15)
+def generate_des15(rng: random.Random, scale: float) -> str:
+    n = side(50, scale)
+    grid = random_grid(rng, n, n, ".O#", [0.7, 0.25, 0.05])
+    for i in range(n):
+        grid[0][i] = grid[-1][i] = grid[i][0] = grid[i][-1] = "#"
+    grid[n // 2][n // 2] = "@"
+
+    moves = "".join(rng.choices("<>^v", k=scaled(20000, scale)))
+    move_lines = [moves[i:i + 1000] for i in range(0, len(moves), 1000)]
+
+    return lines(["".join(row) for row in grid]) + "\n" + lines(move_lines)
+
+
+@generator(16)
+def generate_des16(rng: random.Random, scale: float) -> str:
+    n = odd(side(141, scale))
+    cells = maze(rng, n, n)
+
+    # Knock out some walls so there is more than one path to the end
+    for _ in range(n * n // 40):
+        r, c = rng.randrange(1, n - 1), rng.randrange(1, n - 1)
+        if (r + c) % 2 == 1:
+            cells[r][c] = ord(".")
+
+    cells[n - 2][1] = ord("S")
+    cells[1][n - 2] = ord("E")
+    return lines([row.decode() for row in cells])
+
+
+@generator(17)
+def generate_des17(rng: random.Random, scale: float) -> str:
+    # The same shape of program as the puzzle: the output is a function of the
+    # lowest bits of A, which is shifted by 3 every loop. The scale is the
+    # number of outputs. Part 2 only has an answer if the program happens to
+    # be able to print itself.
+    program = [2, 4, 1, rng.randrange(8), 7, 5, 0, 3, 4, rng.randrange(8), 1, rng.randrange(8),
+               5, 5, 3, 0]
+    outputs = scaled(16, scale)
+    a = rng.randrange(8 ** (outputs - 1), 8 ** outputs)
+
+    return f"Register A: {a}\nRegister B: 0\nRegister C: 0\n\nProgram: {','.join(str(d) for d in program)}\n"
+
+
+@generator(18)
+def generate_des18(rng: random.Random, scale: float) -> str:
+    # The memory space is fixed at 71 x 71 in the solver, so the scale only
+    # sets how many of its bytes fall, up to all of them
+    size = 71
+    cells = [(x, y) for y in range(size) for x in range(size)
+             if (x, y) not in [(0, 0), (size - 1, size - 1)]]
+    rng.shuffle(cells)
+
+    count = min(len(cells), max(1025, scaled(3450, scale)))
+    return lines([f"{x},{y}" for x, y in cells[:count]])
+
+
+@generator(19)
+def generate_des19(rng: random.Random, scale: float) -> str:
+    # Towels per length as in the real input. Every single letter but w is
+    # a towel, and so is every pair but rw. No towel ends in rrw, so a
+    # design ending in rrw can't be made: the towel covering the last w
+    # would have to be w, rw or end in rrw.
+    towels = {"b", "g", "r", "u"}
+    towels |= {a + b for a in "wubrg" for b in "wubrg"} - {"rw"}
+    for length, count in [(3, 120), (4, 100), (5, 80), (6, 60), (7, 40), (8, 20)]:
+        target = len(towels) + count
+        while len(towels) < target:
+            towel = "".join(rng.choices("wubrg", k=length))
+            if not towel.endswith("rrw"):
+                towels.add(towel)
+    towel_list = sorted(towels)
+    rng.shuffle(towel_list)
+
+    designs = []
+    for _ in range(scaled(400, scale)):
+        length = rng.randrange(40, 61)
+        design = ""
+        while len(design) < length:
+            design += rng.choice(towel_list)
+        # About as many impossible designs as in the real input
+        if rng.random() < 0.3:
+            design += "rrw"
+        designs.append(design)
+
+    return ", ".join(towel_list) + "\n\n" + lines(designs)
+
+
+@generator(20)
+def generate_des20(rng: random.Random, scale: float) -> str:
+    # A single track without branches: the path between two corners of a
+    # maze, with every other cell walled off
+    n = odd(side(141, scale))
+    cells = maze(rng, n, n)
+    path = maze_path(cells, (1, 1), (n - 2, n - 2))
+
+    track = [bytearray(b"#" * n) for _ in range(n)]
+    for r, c in path:
+        track[r][c] = ord(".")
+    track[1][1] = ord("S")
+    track[n - 2][n - 2] = ord("E")
+
+    return lines([row.decode() for row in track])
+
+
+@generator(22)
+def generate_des22(rng: random.Random, scale: float) -> str:
+    return lines([str(rng.randrange(1, 1 << 24)) for _ in range(scaled(1685, scale))])
+
+
+def generate(day: int, scale: float = 1.0, seed: int = DEFAULT_SEED) -> str:
+    if day not in GENERATORS:
+        raise ValueError(f"There is no input generator for day {day}")
+
+    return GENERATORS[day](random.Random(seed), scale)
+
+
+def default_path(day: int, scale: float, seed: int) -> Path:
+    scale_name = f"{scale:g}".replace(".", "_")
+    return day_dir(day) / f"generated_x{scale_name}_s{seed}"
+
+
+def write_input(day: int, scale: float = 1.0, seed: int = DEFAULT_SEED,
+                path: str | Path | None = None) -> Path:
+    path = Path(path) if path is not None else default_path(day, scale, seed)
+    path.write_text(generate(day, scale, seed))
+    return path
@@ -0,0 +1,162 @@
+from __future__ import annotations
+from pickle import PickleBuffer
+from typing import Iterable, Iterator
+
+# Value of the padding cells around the grid. It never equals a cell read from
+# an input, so walking off the grid is the same as hitting an OUTSIDE cell.
+OUTSIDE = "\0"
+
+
+class Grid:
+    """
+    A 2D character grid stored as one flat bytearray, one byte per cell.
+
+    The grid is surrounded by `border` cells of OUTSIDE on every side, so
+    looking at the neighbors of any cell never needs a bounds check. Cells
+    are addressed with flat indices, where moving one row is +-stride and one
+    column is +-1. The neighbor offsets are precomputed:
+
+        neighbors4: up, right, down, left
+        neighbors8: up, up right, right, down right, down, down left, left, up left
+    """
+
+    def __init__(self, rows: int, cols: int, fill: str = ".", *, border: int = 1):
+        assert border >= 1, "The grid needs at least one border cell"
+
+        self.rows = rows
+        self.cols = cols
+        self.border = border
+        self.stride = cols + 2 * border
+
+        self.cells = bytearray(OUTSIDE.encode() * (self.stride * (rows + 2 * border)))
+        row = fill.encode() * cols
+        for r in range(rows):
+            start = self.index(r, 0)
+            self.cells[start:start + cols] = row
+
+        s = self.stride
+        self.neighbors4 = (-s, 1, s, -1)
+        self.neighbors8 = (-s, -s + 1, 1, s + 1, s, s - 1, -1, -s - 1)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], *, border: int = 1) -> Grid:
+        lines = [line.strip() for line in lines]
+        lines = [line for line in lines if line]
+
+        grid = cls(len(lines), len(lines[0]), border=border)
+        for r, line in enumerate(lines):
+            assert len(line) == grid.cols, f"Line {r} has length {len(line)}, expected {grid.cols}"
+            start = grid.index(r, 0)
+            grid.cells[start:start + grid.cols] = line.encode()
+
+        return grid
+
+    @classmethod
+    def from_file(cls, filename: str, *, border: int = 1) -> Grid:
+        with open(filename) as fp:
+            return cls.from_lines(fp.readlines(), border=border)
+
+    def __reduce_ex__(self, protocol):
+        # With pickle protocol 5 the cells can be stored out-of-band, which
+        # the input cache uses to write them as raw bytes
+        if protocol < 5:
+            return super().__reduce_ex__(protocol)
+
+        state = self.__dict__.copy()
+        cells = state.pop("cells")
+        return _rebuild_grid, (PickleBuffer(cells), state)
+
+    def __repr__(self) -> str:
+        return f"Grid(rows={self.rows}, cols={self.cols}, border={self.border})"
+
+    def __str__(self) -> str:
+        return "\n".join(self.row(r) for r in range(self.rows))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Grid):
+            return NotImplemented
+        return self.rows == other.rows and self.cols == other.cols and str(self) == str(other)
+
+    def __len__(self) -> int:
+        return self.rows * self.cols
+
+    def __getitem__(self, i: int) -> int:
+        return self.cells[i]
+
+    def __setitem__(self, i: int, value: int):
+        self.cells[i] = value
+
+    def index(self, r: int, c: int) -> int:
+        return (r + self.border) * self.stride + c + self.border
+
+    def position(self, i: int) -> tuple[int,int]:
+        r, c = divmod(i, self.stride)
+        return r - self.border, c - self.border
+
+    def within(self, r: int, c: int) -> bool:
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def inside(self, i: int) -> bool:
+        """Flat index version of within, only valid up to border cells out."""
+        return self.cells[i] != 0
+
+    def at(self, r: int, c: int) -> str:
+        return chr(self.cells[self.index(r, c)])
+
+    def set(self, r: int, c: int, value: str):
+        self.cells[self.index(r, c)] = ord(value)
+
+    def row(self, r: int) -> str:
+        start = self.index(r, 0)
+        return self.cells[start:start + self.cols].decode()
+
+    def indices(self) -> Iterator[int]:
+        """All flat indices inside the grid in row-major order."""
+        for r in range(self.rows):
+            start = self.index(r, 0)
+            yield from range(start, start + self.cols)
+
+    def find(self, value: str) -> int:
+        """Flat index of the first cell with value, or -1."""
+        return self.cells.find(value.encode())
+
+    def find_all(self, value: str) -> list[int]:
+        target = value.encode()
+        found = []
+        i = self.cells.find(target)
+        while i != -1:
+            found.append(i)
+            i = self.cells.find(target, i + 1)
+
+        return found
+
+    def copy(self) -> Grid:
+        grid = Grid.__new__(Grid)
+        grid.__dict__.update(self.__dict__)
+        grid.cells = self.cells.copy()
+        return grid
+
+    def numpy(self, *, padded: bool = False):
+        """
+        A (rows, cols) uint8 NumPy view of the cells, or the full padded array
+        with padded=True. The view shares memory with the grid.
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("Grid.numpy requires NumPy to be installed") from e
+
+        full = np.frombuffer(self.cells, dtype=np.uint8).reshape(-1, self.stride)
+        if padded:
+            return full
+
+        b = self.border
+        return full[b:b + self.rows, b:b + self.cols]
+
+
+def _rebuild_grid(cells, state: dict) -> Grid:
+    grid = Grid.__new__(Grid)
+    grid.__dict__.update(state)
+    # Always copy, the cells may be a read-only view of the cache file
+    grid.cells = bytearray(cells)
+    return grid
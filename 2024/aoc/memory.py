@@ -0,0 +1,178 @@
+import linecache
+import resource
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+UNITS = {"": 1, "B": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def parse_size(size: str) -> int:
+    """Parses sizes like 512K, 200M or 2G (powers of 1024) into bytes."""
+    size = size.strip().upper().removesuffix("IB").removesuffix("B")
+    unit = size[-1] if size and size[-1] in UNITS else ""
+    number = size[:-1] if unit else size
+    return int(float(number) * UNITS[unit])
+
+
+def format_size(n: int | float | None) -> str:
+    if n is None:
+        return "n/a"
+
+    if n < 1024:
+        return f"{n} B"
+
+    for unit in ["KiB", "MiB", "GiB"]:
+        n /= 1024
+        if n < 1024 or unit == "GiB":
+            break
+
+    return f"{n:.1f} {unit}"
+
+
+def _read_status(field: str) -> int | None:
+    try:
+        with open("/proc/self/status") as fp:
+            for line in fp:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """
+    Resets the peak RSS of this process so it can be measured per step. This
+    only works on Linux, elsewhere the peak is for the whole process.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as fp:
+            fp.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss() -> int:
+    peak = _read_status("VmHWM")
+    if peak is not None:
+        return peak
+
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class MemoryUsage:
+    def __init__(self, peak_rss: int, rss_is_per_step: bool,
+                 traced_peak: int, traced_current: int,
+                 top: list[tuple[str,int,int]]):
+        self.peak_rss = peak_rss
+        self.rss_is_per_step = rss_is_per_step
+        self.traced_peak = traced_peak
+        self.traced_current = traced_current
+        # (location, size, count) of the largest allocations still alive at
+        # the end of the step
+        self.top = top
+
+    def __repr__(self) -> str:
+        return f"MemoryUsage(peak_rss={self.peak_rss}, traced_peak={self.traced_peak}, "\
+               f"traced_current={self.traced_current})"
+
+    def __str__(self) -> str:
+        rss_note = "" if self.rss_is_per_step else " (whole process)"
+        lines = [f"peak rss {format_size(self.peak_rss)}{rss_note}, "
+                 f"tracemalloc peak {format_size(self.traced_peak)}, "
+                 f"still allocated {format_size(self.traced_current)}"]
+        for location, size, count in self.top:
+            lines.append(f"    {format_size(size):>10} in {count:>8} blocks  {location}")
+
+        return "\n".join(lines)
+
+
+class MemoryTracker:
+    """
+    Measures peak RSS and tracemalloc peak for each wrapped step, and the
+    top allocation sites still alive at the end of it. Budgets are a peak
+    tracemalloc size in bytes per step name, or for every step under "*".
+
+    tracemalloc makes allocation heavy code several times slower, so the
+    times of a run with a MemoryTracker shouldn't be compared with normal
+    runs.
+    """
+
+    def __init__(self, *, top: int = 5, budgets: dict[str,int] | None = None):
+        self.top = top
+        self.budgets = budgets or {}
+        self.usage: dict[str,MemoryUsage] = {}
+
+    def __repr__(self) -> str:
+        return f"MemoryTracker(top={self.top}, budgets={self.budgets})"
+
+    def wrap(self, name: str, func: Callable[[], Any]) -> Callable[[], Any]:
+        def tracked() -> Any:
+            rss_is_per_step = reset_peak_rss()
+            tracemalloc.start()
+            try:
+                result = func()
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            self.usage[name] = MemoryUsage(peak_rss(), rss_is_per_step, peak, current,
+                                           self._top_sites(snapshot))
+            return result
+
+        return tracked
+
+    def _top_sites(self, snapshot: tracemalloc.Snapshot) -> list[tuple[str,int,int]]:
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+        sites = []
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            frame = stat.traceback[0]
+            code = linecache.getline(frame.filename, frame.lineno).strip()
+            path = Path(frame.filename)
+            location = f"{path.parent.name}/{path.name}" if path.parent.name else path.name
+            location = f"{location}:{frame.lineno}"
+            sites.append((f"{location}  {code}", stat.size, stat.count))
+
+        return sites
+
+    def budget(self, name: str) -> int | None:
+        return self.budgets.get(name, self.budgets.get("*"))
+
+    def check(self, name: str) -> str | None:
+        """An error message if the step went over its budget, otherwise None."""
+        budget = self.budget(name)
+        usage = self.usage.get(name)
+        if budget is None or usage is None:
+            return None
+
+        if usage.traced_peak > budget:
+            return f"memory budget exceeded, peak {format_size(usage.traced_peak)} > "\
+                   f"budget {format_size(budget)}"
+
+        return None
+
+
+def parse_budgets(specs: list[str]) -> dict[str,int]:
+    """
+    Parses budgets given as "200M" (every step) or "part2=200M" (one step).
+    """
+    budgets = {}
+    for spec in specs:
+        if "=" in spec:
+            name, size = spec.split("=", 1)
+        else:
+            name, size = "*", spec
+        budgets[name.strip()] = parse_size(size)
+
+    return budgets
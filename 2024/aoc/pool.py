@@ -0,0 +1,173 @@
+import os
+import signal
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from aoc.runner import PARTS, PartResult, run_day
+
+
+class TaskTimeout(BaseException):
+    # Derived from BaseException so the error handling in run_day doesn't
+    # swallow it and carry on with the next part
+    pass
+
+
+class Task:
+    def __init__(self, day: int, input_file: str, parts: list[str], use_cache: bool = False,
+                 stream: bool = False):
+        self.day = day
+        self.input_file = input_file
+        self.parts = parts
+        self.use_cache = use_cache
+        self.stream = stream
+
+    def __repr__(self) -> str:
+        return f"Task(day={self.day}, input={self.input_file}, parts={self.parts})"
+
+    def failed(self, error: str) -> list[PartResult]:
+        return [PartResult(self.day, part, None, 0.0, error=error) for part in self.parts]
+
+    def interrupted(self, finished: list[PartResult], error: str) -> list[PartResult]:
+        """
+        The results of a task that was stopped while running: the steps that
+        finished, error for the step that was running, and the steps after
+        it marked as not run.
+        """
+        steps = ["parse"] + [part for part in self.parts if part != "parse"]
+        results = list(finished)
+        for k, part in enumerate(steps[len(finished):]):
+            if k == 0:
+                results.append(PartResult(self.day, part, None, 0.0, error=error))
+            else:
+                results.append(PartResult(self.day, part, None, 0.0,
+                                          error=f"not run, {steps[len(finished)]} {error}"))
+
+        return results
+
+
+def _raise_timeout(signum, frame):
+    raise TaskTimeout()
+
+
+def run_task(task: Task, timeout: float | None = None) -> list[PartResult]:
+    """Runs in a worker process. The timeout is enforced with SIGALRM."""
+    if timeout is not None:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    # Collected as the steps finish, so a timeout keeps the ones that did
+    finished: list[PartResult] = []
+    try:
+        return run_day(task.day, task.input_file, parts=task.parts, use_cache=task.use_cache,
+                       stream=task.stream, on_result=finished.append)
+    except TaskTimeout:
+        return task.interrupted(finished, f"timed out after {timeout}s")
+    except BaseException as e:
+        return task.failed(repr(e))
+    finally:
+        if timeout is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def make_tasks(days: list[int], input_file: str, split_parts: bool = False,
+               use_cache: bool = False, stream: bool = False) -> list[Task]:
+    tasks = []
+    for day in days:
+        if split_parts:
+            # Each part parses the input itself since parsed inputs aren't
+            # shared between processes
+            tasks.append(Task(day, input_file, ["part1"], use_cache, stream))
+            tasks.append(Task(day, input_file, ["part2"], use_cache, stream))
+        else:
+            tasks.append(Task(day, input_file, ["part1", "part2"], use_cache, stream))
+
+    return tasks
+
+
+def _collect(futures: dict[Future,Task]) -> tuple[list[PartResult],list[Task]]:
+    results = []
+    broken = []
+    for future, task in futures.items():
+        try:
+            results.extend(future.result())
+        except BrokenProcessPool:
+            broken.append(task)
+
+    return results, broken
+
+
+def run_parallel(days: list[int], input_file: str = "input", *,
+                 jobs: int | None = None,
+                 split_parts: bool = False,
+                 timeout: float | None = None,
+                 use_cache: bool = False,
+                 stream: bool = False) -> list[PartResult]:
+    """
+    Runs days in a process pool, one task per day (or per part with
+    split_parts). When a worker dies the whole pool is broken, so every task
+    that didn't finish is rerun in a pool of its own. That way only the task
+    that actually crashes is reported as failed.
+    """
+    tasks = make_tasks(days, input_file, split_parts, use_cache, stream)
+    jobs = jobs or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(run_task, task, timeout): task for task in tasks}
+        wait(futures)
+    results, broken = _collect(futures)
+
+    for i in range(0, len(broken), jobs):
+        executors = [ProcessPoolExecutor(max_workers=1) for _ in broken[i:i + jobs]]
+        futures = {
+            executor.submit(run_task, task, timeout): task
+            for executor, task in zip(executors, broken[i:i + jobs])
+        }
+        wait(futures)
+        for executor in executors:
+            executor.shutdown()
+
+        isolated_results, crashed = _collect(futures)
+        results.extend(isolated_results)
+        for task in crashed:
+            results.extend(task.failed("worker crashed"))
+
+    return merge_results(results)
+
+
+def merge_results(results: list[PartResult]) -> list[PartResult]:
+    """
+    Orders results by day and part. With split parts each day is parsed
+    twice, only the first parse is kept.
+    """
+    merged = {}
+    for result in results:
+        key = (result.day, result.part)
+        if key not in merged:
+            merged[key] = result
+
+    return sorted(merged.values(), key=lambda r: (r.day, PARTS.index(r.part)))
+
+
+def format_summary(results: list[PartResult], wall_time: float) -> str:
+    header = f"{'day':<6} {'part':<6} {'time':>10}  answer"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        answer = result.answer if result.error is None else f"FAILED: {result.error}"
+        if result.part == "parse" and result.error is None:
+            answer = ""
+        lines.append(f"des{result.day:<3} {result.part:<6} {result.elapsed:>10.4f}  {answer}")
+
+    total = sum(result.elapsed for result in results)
+    lines.append("-" * len(header))
+    lines.append(f"sum of part times {total:.4f}s, wall time {wall_time:.4f}s "
+                 f"({os.cpu_count()} cpus)")
+
+    return "\n".join(lines)
+
+
+def run_all(days: list[int], input_file: str = "input", **kwargs) -> tuple[list[PartResult],float]:
+    t0 = time.perf_counter()
+    results = run_parallel(days, input_file, **kwargs)
+    t1 = time.perf_counter()
+    return results, t1 - t0
@@ -0,0 +1,183 @@
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable
+
+PROFILE_DIR = Path(__file__).resolve().parent.parent / "profiles"
+MODES = ["cprofile", "sample"]
+
+Frame = tuple[str,str,int]
+
+
+def _profiled_call(func: Callable[[], Any]) -> Any:
+    # The sampler drops every frame up to and including this one, so the
+    # stacks start at the part that is profiled
+    return func()
+
+
+class Sampler:
+    """
+    A sampling profiler. A background thread looks at the stack of the
+    profiled thread every interval seconds and counts each distinct stack.
+    The overhead doesn't depend on how many function calls the code makes,
+    unlike cProfile.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter[tuple[Frame,...]] = Counter()
+        self.elapsed = 0.0
+        self._target = threading.get_ident()
+        self._running = False
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._running = True
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._start_time = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self._start_time
+
+    def _sample(self):
+        while self._running:
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                stack = self._stack(frame)
+                if stack:
+                    self.stacks[stack] += 1
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _stack(frame: FrameType | None) -> tuple[Frame,...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            if code is _profiled_call.__code__:
+                break
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        else:
+            # Sampled outside of the profiled call
+            return ()
+
+        return tuple(reversed(stack))
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one "root;...;leaf count" line per stack (flamegraph.pl format)."""
+        lines = []
+        for stack, count in sorted(self.stacks.items()):
+            names = ";".join(f"{name} ({Path(filename).name}:{line})" for name, filename, line in stack)
+            lines.append(f"{names} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> dict:
+        """The samples in the speedscope file format, https://www.speedscope.app/"""
+        frames: list[Frame] = []
+        frame_index: dict[Frame,int] = {}
+        samples = []
+        weights = []
+
+        # The samples are further apart than interval (the sampler waits for
+        # the GIL and the scheduler), so each one is weighted by its share of
+        # the measured time and the profile adds up to the wall time
+        total_samples = sum(self.stacks.values())
+        sample_time = self.elapsed / total_samples if total_samples and self.elapsed else self.interval
+        for stack, count in self.stacks.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append(frame)
+                indices.append(frame_index[frame])
+            samples.append(indices)
+            weights.append(count * sample_time)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {
+                "frames": [{"name": n, "file": f, "line": l} for n, f, l in frames],
+            },
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": name,
+            "exporter": "aoc.profiling",
+        }
+
+
+class Profiler:
+    """
+    Wraps parts of a day in either cProfile or the sampling profiler and
+    writes the output to directory, named <tag>-<part>.<ext> (or just
+    <part>.<ext> without a tag). cprofile writes a .prof file for pstats or
+    snakeviz and a text summary, sample writes collapsed stacks and a
+    speedscope JSON file.
+    """
+
+    def __init__(self, mode: str, directory: str | Path, *,
+                 tag: str = "", interval: float = 0.005):
+        if mode not in MODES:
+            raise ValueError(f"Profiler mode '{mode}' is invalid, expected one of {MODES}")
+
+        self.mode = mode
+        self.directory = Path(directory)
+        self.tag = tag
+        self.interval = interval
+
+    def __repr__(self) -> str:
+        return f"Profiler(mode={self.mode}, directory={self.directory}, tag={self.tag})"
+
+    def output_path(self, name: str, suffix: str) -> Path:
+        stem = f"{self.tag}-{name}" if self.tag else name
+        return self.directory / f"{stem}{suffix}"
+
+    def wrap(self, name: str, func: Callable[[], Any]) -> Callable[[], Any]:
+        if self.mode == "cprofile":
+            return lambda: self._run_cprofile(name, func)
+        else:
+            return lambda: self._run_sampler(name, func)
+
+    def _run_cprofile(self, name: str, func: Callable[[], Any]) -> Any:
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(_profiled_call, func)
+        finally:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(self.output_path(name, ".prof"))
+
+            summary = io.StringIO()
+            stats = pstats.Stats(profile, stream=summary)
+            stats.sort_stats("cumulative").print_stats(40)
+            self.output_path(name, ".txt").write_text(summary.getvalue())
+
+    def _run_sampler(self, name: str, func: Callable[[], Any]) -> Any:
+        sampler = Sampler(self.interval)
+        sampler.start()
+        try:
+            return _profiled_call(func)
+        finally:
+            sampler.stop()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.output_path(name, ".collapsed").write_text(sampler.collapsed())
+            with open(self.output_path(name, ".speedscope.json"), "w") as fp:
+                json.dump(sampler.speedscope(f"{self.directory.name} {name}"), fp)
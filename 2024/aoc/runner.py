@@ -0,0 +1,272 @@
+import importlib.util
+import inspect
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from copy import deepcopy
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+from aoc import cache
+from aoc.memory import MemoryTracker, MemoryUsage
+from aoc.profiling import Profiler
+
+# The day directories (des1, des2, ...) live next to this package
+DAYS_DIR = Path(__file__).resolve().parent.parent
+
+PARTS = ["parse", "part1", "part2"]
+
+
+def day_dir(day: int) -> Path:
+    return DAYS_DIR / f"des{day}"
+
+
+def available_days() -> list[int]:
+    days = []
+    for path in DAYS_DIR.glob("des*/solve.py"):
+        days.append(int(path.parent.name[len("des"):]))
+
+    return sorted(days)
+
+
+def resolve_input(day: int, input_file: str) -> Path:
+    """
+    An input can either be given as a path, or as the name of a file in the
+    day directory, e.g. "input" or "example_input".
+    """
+    path = day_dir(day) / input_file
+    if path.exists():
+        return path
+
+    path = Path(input_file)
+    if not path.exists():
+        raise FileNotFoundError(f"No input file '{input_file}' for day {day}")
+
+    return path
+
+
+_modules: dict[int,ModuleType] = {}
+
+def load_module(day: int) -> ModuleType:
+    if day in _modules:
+        return _modules[day]
+
+    path = day_dir(day) / "solve.py"
+    if not path.exists():
+        raise ValueError(f"Day {day} has no solver ({path})")
+
+    spec = importlib.util.spec_from_file_location(f"des{day}", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    # Registered like a normal import so classes from the day can be pickled
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+    _modules[day] = module
+    return module
+
+
+def supports_streaming(day: int) -> bool:
+    """Days with an iter_file can be run on a stream of records, see Day."""
+    return hasattr(load_module(day), "iter_file")
+
+
+def required_arguments(func: Callable) -> int:
+    count = 0
+    for param in inspect.signature(func).parameters.values():
+        is_positional = param.kind in [param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD]
+        if is_positional and param.default is param.empty:
+            count += 1
+
+    return count
+
+
+class Day:
+    """
+    A day's solve.py. With stream=True the parse step is skipped, and every
+    part reads the input itself through the day's iter_file generator,
+    calling solve_<part>_stream if the day has one and solve_<part>
+    otherwise. The records are then never all in memory at once.
+    """
+
+    def __init__(self, day: int, *, use_cache: bool = False, stream: bool = False):
+        self.day = day
+        self.module = load_module(day)
+        self.use_cache = use_cache
+        self.stream = stream
+
+        if stream and not supports_streaming(day):
+            raise ValueError(f"{self.name} has no streaming parser (iter_file)")
+
+    def __repr__(self) -> str:
+        return f"Day({self.day})"
+
+    @property
+    def name(self) -> str:
+        return f"des{self.day}"
+
+    @property
+    def parser_version(self) -> str:
+        """
+        The hash of the day's solve.py (or PARSER_VERSION if the day sets it),
+        so any change to the day invalidates its cached inputs. Changes to
+        shared code like aoc.grid are not picked up, clear the cache after
+        those.
+        """
+        if hasattr(self.module, "PARSER_VERSION"):
+            return str(self.module.PARSER_VERSION)
+        return cache.file_hash(self.module.__file__)
+
+    def parse(self, filename: str | Path) -> Any:
+        if self.use_cache:
+            return cache.cached_parse(self.name, filename, self.module.parse_file,
+                                      self.parser_version)
+
+        return self.module.parse_file(str(filename))
+
+    def task(self, part: str, filename: str | Path, puzzle_input: Any = None) -> Callable[[], Any]:
+        """
+        Returns a function without arguments that runs one part of the day.
+        Everything that shouldn't be timed (copying the input etc.) is done
+        here and not in the returned function.
+        """
+        if self.stream:
+            return self.stream_task(part, filename)
+
+        if part == "parse":
+            return lambda: self.parse(filename)
+
+        solver = getattr(self.module, f"solve_{part}")
+
+        # Some days mutate their input (the scripts deepcopy before each part)
+        # so give each part its own copy
+        puzzle_input = deepcopy(puzzle_input)
+
+        # Days like des1 return a tuple from parse_file which is unpacked into
+        # several arguments to the solvers
+        if required_arguments(solver) > 1:
+            return lambda: solver(*puzzle_input)
+        else:
+            return lambda: solver(puzzle_input)
+
+    def stream_task(self, part: str, filename: str | Path) -> Callable[[], Any]:
+        if part == "parse":
+            return lambda: None
+
+        solver = getattr(self.module, f"solve_{part}_stream", None)
+        if solver is None:
+            solver = getattr(self.module, f"solve_{part}")
+        iter_file = self.module.iter_file
+
+        # Like parse_file, iter_file returns a tuple when the solvers take
+        # several arguments (des5 gives the rules and an iterator of updates)
+        if required_arguments(solver) > 1:
+            return lambda: solver(*iter_file(str(filename)))
+        else:
+            return lambda: solver(iter_file(str(filename)))
+
+
+class PartResult:
+    def __init__(self, day: int, part: str, answer: Any, elapsed: float,
+                 error: str | None = None, memory: MemoryUsage | None = None):
+        self.day = day
+        self.part = part
+        self.answer = answer
+        self.elapsed = elapsed
+        self.error = error
+        self.memory = memory
+
+    def __repr__(self) -> str:
+        return f"PartResult(day={self.day}, part={self.part}, answer={self.answer}, "\
+               f"elapsed={self.elapsed:.4f}s, error={self.error})"
+
+    def __str__(self) -> str:
+        label = f"des{self.day} {self.part}:"
+        if self.error is not None:
+            line = f"{label} failed ({self.error})"
+        elif self.part == "parse":
+            line = f"{label} (elapsed time: {self.elapsed:.4f}s)"
+        else:
+            line = f"{label} {self.answer} (elapsed time: {self.elapsed:.4f}s)"
+
+        if self.memory is not None:
+            line += f"\n    memory: {self.memory}"
+
+        return line
+
+
+def call_quietly(func: Callable[[], Any], verbose: bool = False) -> Any:
+    # A lot of the days print boards and debug output while solving
+    if verbose:
+        return func()
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        return func()
+
+
+def timed(func: Callable[[], Any], verbose: bool = False) -> tuple[Any,float]:
+    t0 = time.perf_counter()
+    result = call_quietly(func, verbose)
+    t1 = time.perf_counter()
+    return result, t1 - t0
+
+
+def run_day(day: int, input_file: str = "input", *,
+            parts: list[str] = ["part1", "part2"],
+            verbose: bool = False,
+            use_cache: bool = False,
+            stream: bool = False,
+            profiler: Profiler | None = None,
+            memory: MemoryTracker | None = None,
+            on_result: Callable[[PartResult], None] | None = None) -> list[PartResult]:
+    """
+    Parse the input and run the given parts of a day in this process. The
+    parse step is always run, and is always the first result. With a
+    profiler or memory tracker every step is instrumented, and the times
+    include their overhead. A step that goes over its memory budget is
+    reported as failed. on_result is called with each result as soon as
+    its step is done, so they aren't lost if the run is interrupted.
+    """
+    solver = Day(day, use_cache=use_cache, stream=stream)
+    filename = resolve_input(day, input_file)
+
+    def measure(part: str, func: Callable[[], Any]) -> tuple[Any,PartResult]:
+        if profiler is not None:
+            func = profiler.wrap(part, func)
+        if memory is not None:
+            func = memory.wrap(part, func)
+
+        try:
+            answer, elapsed = timed(func, verbose)
+        except Exception as e:
+            return None, PartResult(day, part, None, 0.0, error=repr(e))
+
+        result = PartResult(day, part, None if part == "parse" else answer, elapsed)
+        if memory is not None:
+            result.memory = memory.usage.get(part)
+            result.error = memory.check(part)
+
+        return answer, result
+
+    results = []
+
+    def record(result: PartResult):
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    puzzle_input, result = measure("parse", solver.task("parse", filename))
+    record(result)
+    if result.error is not None:
+        return results
+
+    for part in parts:
+        if part == "parse":
+            continue
+
+        _, result = measure(part, solver.task(part, filename, puzzle_input))
+        record(result)
+
+    return results
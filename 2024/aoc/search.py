@@ -0,0 +1,150 @@
+import heapq
+import itertools
+from typing import Callable, Hashable, Iterable, TypeVar
+
+State = TypeVar("State", bound=Hashable)
+
+
+class SearchResult:
+    """
+    Result of a Dijkstra or A* search.
+
+    cost maps every reached state to the cheapest known cost from the start,
+    came_from maps a state to the state it was reached from (None for the
+    start). With all_paths, predecessors maps a state to every state it can be
+    reached from at its cheapest cost.
+    """
+
+    def __init__(self):
+        self.cost: dict = {}
+        self.came_from: dict = {}
+        self.predecessors: dict = {}
+        self.goals: list = []
+
+    def __repr__(self) -> str:
+        return f"SearchResult(goals={self.goals}, reached={len(self.cost)})"
+
+    @property
+    def goal(self):
+        return self.goals[0] if self.goals else None
+
+    @property
+    def found(self) -> bool:
+        return len(self.goals) > 0
+
+    @property
+    def goal_cost(self) -> int | float:
+        return self.cost[self.goal] if self.found else float("inf")
+
+    def path(self, state=None) -> list:
+        """States from the start to state (default: the goal), both included."""
+        if state is None:
+            if not self.found:
+                return []
+            state = self.goal
+
+        path = [state]
+        while (state := self.came_from[state]) is not None:
+            path.append(state)
+
+        return list(reversed(path))
+
+    def states_on_best_paths(self) -> set:
+        """Every state on any of the cheapest paths to the goals, requires all_paths."""
+        seen = set(self.goals)
+        stack = list(self.goals)
+        while stack:
+            state = stack.pop()
+            for prev in self.predecessors.get(state, []):
+                if prev not in seen:
+                    seen.add(prev)
+                    stack.append(prev)
+
+        return seen
+
+
+def a_star(start: State | Iterable[State],
+           neighbors: Callable[[State], Iterable[tuple[State,int]]],
+           is_goal: Callable[[State], bool],
+           heuristic: Callable[[State], int] | None = None,
+           *,
+           multiple_starts: bool = False,
+           all_paths: bool = False) -> SearchResult:
+    """
+    A* search with a heapq open set. States can be anything hashable, e.g. a
+    position or a (position, direction) tuple.
+
+    neighbors(state) yields (next state, cost of the move) pairs and the
+    heuristic must never overestimate the remaining cost. Without a heuristic
+    this is Dijkstra.
+
+    States are pushed again when a cheaper cost is found instead of updating
+    them in the heap, and outdated entries are skipped when popped (lazy
+    deletion).
+
+    With all_paths the search keeps going until every goal state with the
+    cheapest cost is found, and records all equally cheap predecessors.
+    """
+    result = SearchResult()
+    cost = result.cost
+    came_from = result.came_from
+    predecessors = result.predecessors
+
+    if heuristic is None:
+        heuristic = lambda state: 0
+
+    # The counter breaks ties so states themselves are never compared
+    counter = itertools.count()
+    starts = list(start) if multiple_starts else [start]  # pyright: ignore
+
+    open_set = []
+    for s in starts:
+        cost[s] = 0
+        came_from[s] = None
+        heapq.heappush(open_set, (heuristic(s), 0, next(counter), s))
+
+    closed = set()
+    best_goal_cost = float("inf")
+    while open_set:
+        f, g, _, current = heapq.heappop(open_set)
+        if current in closed or g > cost[current]:
+            continue
+
+        if f > best_goal_cost:
+            break
+
+        closed.add(current)
+
+        if is_goal(current):
+            result.goals.append(current)
+            best_goal_cost = g
+            if not all_paths:
+                break
+            continue
+
+        for neighbor, move_cost in neighbors(current):
+            tentative = g + move_cost
+            neighbor_cost = cost.get(neighbor, float("inf"))
+
+            if tentative < neighbor_cost:
+                cost[neighbor] = tentative
+                came_from[neighbor] = current
+                if all_paths:
+                    predecessors[neighbor] = [current]
+                heapq.heappush(open_set, (tentative + heuristic(neighbor), tentative,
+                                          next(counter), neighbor))
+            elif all_paths and tentative == neighbor_cost:
+                predecessors[neighbor].append(current)
+
+    return result
+
+
+def dijkstra(start: State | Iterable[State],
+             neighbors: Callable[[State], Iterable[tuple[State,int]]],
+             is_goal: Callable[[State], bool] = lambda state: False,
+             **kwargs) -> SearchResult:
+    """
+    Dijkstra is A* without a heuristic. With the default is_goal the search
+    finds the cheapest cost to every reachable state.
+    """
+    return a_star(start, neighbors, is_goal, None, **kwargs)
@@ -1,12 +1,19 @@
 import sys
+from collections import Counter
+from typing import Iterable, Iterator
 
-def parse_file(filename: str) -> tuple[list[int], list[int]]:
+def iter_file(filename: str) -> Iterator[tuple[int,int]]:
+    """Yields the pairs of location IDs one line at a time."""
     with open(filename) as fp:
-        input_data = fp.readlines()
+        for line in fp:
+            if line.strip():
+                i, j = [int(d) for d in line.split(" ") if len(d)]
+                yield i, j
+
 
+def parse_file(filename: str) -> tuple[list[int], list[int]]:
     input1, input2 = [], []
-    for line in input_data:
-        i, j = [int(d) for d in line.split(" ") if len(d)]
+    for i, j in iter_file(filename):
         input1.append(i)
         input2.append(j)
 
@@ -41,15 +48,60 @@ def solve_part2(input1: list[int], input2: list[int]) -> int:
     return total_similarity
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
+def count_pairs(pairs: Iterable[tuple[int,int]]) -> tuple[Counter[int],Counter[int]]:
+    count1, count2 = Counter(), Counter()
+    for i, j in pairs:
+        count1[i] += 1
+        count2[j] += 1
+
+    return count1, count2
+
+
+def solve_part1_stream(pairs: Iterable[tuple[int,int]]) -> int:
+    """
+    Part 1 on an iterable of pairs, in memory proportional to the number of
+    distinct IDs instead of the number of lines. Pairing the sorted lists is
+    the same as walking the sorted distinct IDs of both lists and matching
+    up their counts.
+    """
+    count1, count2 = count_pairs(pairs)
+    keys1 = sorted(count1)
+    keys2 = sorted(count2)
+
+    total_distance = 0
+    k1, k2 = 0, 0
+    left1 = count1[keys1[0]] if keys1 else 0
+    left2 = count2[keys2[0]] if keys2 else 0
+    while k1 < len(keys1) and k2 < len(keys2):
+        matched = min(left1, left2)
+        total_distance += matched * abs(keys1[k1] - keys2[k2])
+
+        left1 -= matched
+        left2 -= matched
+        if left1 == 0:
+            k1 += 1
+            left1 = count1[keys1[k1]] if k1 < len(keys1) else 0
+        if left2 == 0:
+            k2 += 1
+            left2 = count2[keys2[k2]] if k2 < len(keys2) else 0
+
+    return total_distance
+
+
+def solve_part2_stream(pairs: Iterable[tuple[int,int]]) -> int:
+    count1, count2 = count_pairs(pairs)
+    return sum(i * n * count2[i] for i, n in count1.items())
+
 
-input1, input2 = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-total_distance = solve_part1(input1, input2)
-print("part1:", total_distance)
+    input1, input2 = parse_file(sys.argv[1])
 
-total_similarity = solve_part2(input1, input2)
-print("part2:", total_similarity)
+    total_distance = solve_part1(input1, input2)
+    print("part1:", total_distance)
 
+    total_similarity = solve_part2(input1, input2)
+    print("part2:", total_similarity)
@@ -1,93 +1,121 @@
 import sys
+from pathlib import Path
 
-def parse_file(filename: str) -> list[list[int]]:
-    with open(filename) as fp:
-        lines = fp.readlines()
+# Make the shared aoc package importable when running this file as a script
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from aoc.grid import Grid
 
-    topo = []
-    for line in lines:
-        topo.append([int(d) for d in line.strip()])
+# Heights are kept as the digit characters. They are consecutive bytes, so
+# "one higher" is still + 1, and the border never matches a height.
+TRAILHEAD = ord("0")
+PEAK = ord("9")
 
-    return topo
 
+def parse_file(filename: str) -> Grid:
+    return Grid.from_file(filename)
 
-def solve_part1(topo: list[list[int]]) -> int:
-    rows = len(topo)
-    cols = len(topo[0])
 
-    def find_trail_ends(start: tuple[int,int]) -> set[tuple[int,int]]:
-        r, c = start
-        
-        if topo[r][c] == 9:
-            return {(r, c)}
+def solve_part1_dfs(topo: Grid) -> int:
 
-        ends = set()
-        for dr, dc in [ (-1, 0), (0, -1), (1, 0), (0, 1), ]:
-            rr = r + dr
-            cc = c + dc
-            
-            if rr < 0 or rr >= rows or cc < 0 or cc >= cols:
-                continue
+    def find_trail_ends(start: int) -> set[int]:
+        if topo[start] == PEAK:
+            return {start}
 
-            if topo[rr][cc] == topo[r][c] + 1 and (rr, cc) not in ends:
-                ends = ends | find_trail_ends((rr, cc))
+        ends = set()
+        for d in topo.neighbors4:
+            i = start + d
+            if topo[i] == topo[start] + 1 and i not in ends:
+                ends = ends | find_trail_ends(i)
 
         return ends
 
 
     trail_count = 0
-    for r in range(rows):
-        for c in range(cols):
-            if topo[r][c] == 0:
-                ends = find_trail_ends((r, c))
-                trail_count += len(ends)
+    for i in topo.find_all(chr(TRAILHEAD)):
+        ends = find_trail_ends(i)
+        trail_count += len(ends)
 
     return trail_count
 
 
-def solve_part2(topo: list[list[int]]) -> int:
-    rows = len(topo)
-    cols = len(topo[0])
+def solve_part2_dfs(topo: Grid) -> int:
 
-    def find_unique_trails(start: tuple[int,int]) -> int:
-        r, c = start
-        
-        if topo[r][c] == 9:
+    def find_unique_trails(start: int) -> int:
+        if topo[start] == PEAK:
             return 1
 
         count = 0
-        for dr, dc in [ (-1, 0), (0, -1), (1, 0), (0, 1), ]:
-            rr = r + dr
-            cc = c + dc
-            
-            if rr < 0 or rr >= rows or cc < 0 or cc >= cols:
-                continue
-
-            if topo[rr][cc] == topo[r][c] + 1:
-                count += find_unique_trails((rr, cc))
+        for d in topo.neighbors4:
+            i = start + d
+            if topo[i] == topo[start] + 1:
+                count += find_unique_trails(i)
 
         return count
 
 
     trail_count = 0
-    for r in range(rows):
-        for c in range(cols):
-            if topo[r][c] == 0:
-                count = find_unique_trails((r, c))
-                trail_count += count
+    for i in topo.find_all(chr(TRAILHEAD)):
+        count = find_unique_trails(i)
+        trail_count += count
 
     return trail_count
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
+def rate_trails(topo: Grid) -> tuple[int,int]:
+    """
+    Scores and rates every trailhead in one pass over the heights from 9 down
+    to 0. Each cell gets the set of peaks it can reach, as a bitset with one
+    bit per peak, and the number of trails from it to any peak. A cell's set is
+    the union of the sets of its neighbors one higher, and its count the sum
+    of their counts, so every cell is only visited once.
+
+    Return:
+        The sum of the trailhead scores (part 1) and ratings (part 2)
+    """
+    reachable = [0] * len(topo.cells)
+    trails = [0] * len(topo.cells)
+    for bit, i in enumerate(topo.find_all(chr(PEAK))):
+        reachable[i] = 1 << bit
+        trails[i] = 1
+
+    for height in range(PEAK - 1, TRAILHEAD - 1, -1):
+        for i in topo.find_all(chr(height)):
+            peaks = 0
+            count = 0
+            for d in topo.neighbors4:
+                j = i + d
+                if topo[j] == height + 1:
+                    peaks |= reachable[j]
+                    count += trails[j]
+            reachable[i] = peaks
+            trails[i] = count
+
+    score = 0
+    rating = 0
+    for i in topo.find_all(chr(TRAILHEAD)):
+        score += reachable[i].bit_count()
+        rating += trails[i]
+
+    return score, rating
+
+
+def solve_part1(topo: Grid) -> int:
+    return rate_trails(topo)[0]
+
+
+def solve_part2(topo: Grid) -> int:
+    return rate_trails(topo)[1]
+
 
-puzzle_input = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-sol1 = solve_part1(puzzle_input)
-print("part1:", sol1)
+    puzzle_input = parse_file(sys.argv[1])
 
-sol2 = solve_part2(puzzle_input)
-print("part2:", sol2)
+    sol1 = solve_part1(puzzle_input)
+    print("part1:", sol1)
 
+    sol2 = solve_part2(puzzle_input)
+    print("part2:", sol2)
@@ -1,6 +1,7 @@
 import sys
 import time
-from typing import Generator
+from bisect import bisect_right
+from collections import Counter
 
 def parse_file(filename: str) -> list[int]:
     with open(filename) as fp:
@@ -9,78 +10,77 @@ def parse_file(filename: str) -> list[int]:
     return digits
 
 
-def solve_part1(puzzle_input: list[int]) -> int:
+POWERS_OF_TEN = [10 ** k for k in range(64)]
 
-    def split_stones(digits: list[int]) -> list[int]:
-        new_digits = []
-        for d in digits:
-            if d == 0:
-                new_digits.append(1)
-            elif (l := len(str(d))) % 2 == 0:
-                mid = l // 2
-                sd = str(d)
-                left, right = sd[:mid], sd[mid:]
-                new_digits.append(int(left))
-                new_digits.append(int(right))
-            else:
-                new_digits.append(d * 2024)
+# What a stone turns into after one blink. The stones only ever take a few
+# thousand distinct values, so this is kept between blinks and between runs.
+transitions: dict[int,tuple[int,...]] = {}
 
-        return new_digits
 
+def count_digits(stone: int) -> int:
+    # Number of powers of ten <= stone, for stone >= 1
+    digits = bisect_right(POWERS_OF_TEN, stone)
+    assert digits < len(POWERS_OF_TEN), f"Stone {stone} has too many digits"
+    return digits
 
-    digits = puzzle_input.copy()
-    for _ in range(25):
-        digits = split_stones(digits)
 
-    return len(digits)
+def blink_stone(stone: int) -> tuple[int,...]:
+    if stone == 0:
+        return (1,)
 
+    digits = count_digits(stone)
+    if digits % 2 == 0:
+        # Left and right half of the digits
+        return divmod(stone, POWERS_OF_TEN[digits // 2])
 
-def solve_part2(puzzle_input: list[int]) -> int:
-    target_blinks = 75
+    return (stone * 2024,)
+
+
+def blink(stones: Counter[int], blinks: int) -> Counter[int]:
+    """
+    Stones with the same value always turn into the same stones, so only the
+    count of each value is kept, not the stones themselves.
+    """
+    for _ in range(blinks):
+        next_stones = Counter()
+        for stone, count in stones.items():
+            new_stones = transitions.get(stone)
+            if new_stones is None:
+                new_stones = transitions[stone] = blink_stone(stone)
 
-    memo = {}
-    def split_stone(digit: int, blinks: int = 0) -> int:
-        if blinks == target_blinks:
-            return 1
+            for new_stone in new_stones:
+                next_stones[new_stone] += count
 
-        if (digit, blinks) in memo:
-            return memo[(digit, blinks)]
+        stones = next_stones
 
-        count = 0 
-        if digit == 0:
-            count += split_stone(1, blinks + 1)
-        elif len(str(digit)) % 2 == 0:
-            sd = str(digit)
-            mid = len(sd) // 2
-            left, right = sd[:mid], sd[mid:]
-            count += split_stone(int(left), blinks + 1)
-            count += split_stone(int(right), blinks + 1)
-        else:
-            count += split_stone(digit * 2024, blinks + 1)
+    return stones
 
-        memo[(digit, blinks)] = count
-        return count
 
-    total_count = 0
-    for digit in puzzle_input:
-        total_count += split_stone(digit)
+def count_stones(puzzle_input: list[int], blinks: int) -> int:
+    return sum(blink(Counter(puzzle_input), blinks).values())
 
-    return total_count
 
+def solve_part1(puzzle_input: list[int]) -> int:
+    return count_stones(puzzle_input, 25)
+
+
+def solve_part2(puzzle_input: list[int]) -> int:
+    return count_stones(puzzle_input, 75)
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
 
-puzzle_input = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-t0 = time.time()
-sol1 = solve_part1(puzzle_input)
-t1 = time.time()
-print("part1:", sol1, f"(elapsed time: {t1 - t0:.4f}s)")
+    puzzle_input = parse_file(sys.argv[1])
 
-t0 = time.time()
-sol2 = solve_part2(puzzle_input)
-t1 = time.time()
-print("part2:", sol2, f"(elapsed time: {t1 - t0:.4f}s)")
+    t0 = time.time()
+    sol1 = solve_part1(puzzle_input)
+    t1 = time.time()
+    print("part1:", sol1, f"(elapsed time: {t1 - t0:.4f}s)")
 
+    t0 = time.time()
+    sol2 = solve_part2(puzzle_input)
+    t1 = time.time()
+    print("part2:", sol2, f"(elapsed time: {t1 - t0:.4f}s)")
@@ -1,160 +1,83 @@
-from __future__ import annotations
 import sys
-from copy import deepcopy
-
-def parse_file(filename: str) -> list[list[str]]:
-    with open(filename) as fp:
-        grid = [list(line.strip()) for line in fp.readlines()]
-
-    return grid
-
-
-class DirectedEdge:
-    def __init__(self, start: tuple[int,int], end: tuple[int,int]):
-        self.start = start
-        self.end = end
-
-    def __repr__(self):
-        return f"{self.start}->{self.end}"
-
-    def opposite(self, other: DirectedEdge) -> bool:
-        return self.start == other.end and self.end == other.start
-
-
-class GardenPlot:
-    def __init__(self, cells: set[tuple[int,int]], label: str = ""):
-        self.cells = deepcopy(cells)
-        self.label = label
-        self.find_outline()
-
-    def __repr__(self):
-        return f"Plot(label={repr(self.label)}, area={self.area()}, cells={' '.join(str(c) for c in self.cells)})"
-
-    def area(self) -> int:
-        return len(self.cells)
-
-    def perimeter(self) -> int:
-        assert self.outline is not None, \
-            "Must call GardenPlot.find_outline before computing the perimeter"
-        return len(self.outline)
-
-    def sides(self) -> int:
-        # TODO: for part 2
-        return -1
-
-    def cost(self) -> int:
-        return self.area() * self.perimeter()
-
-    def bulk_cost(self) -> int:
-        return self.area() * self.sides()
-
-    def contains(self, cell: tuple[int,int]) -> bool:
-        return cell in self.cells
-
-    def find_outline(self) -> list[DirectedEdge]:
-        def cell_edges(cell: tuple[int,int]) -> list[DirectedEdge]:
-            r, c = cell
-            vectors = []
-            for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                rr = r + dr
-                cc = c + dc
-                vectors.append(DirectedEdge((r, c), (rr, cc)))
-                r = rr
-                c = cc
-
-            return vectors
-
-        edges = [edge for cell in self.cells for edge in cell_edges(cell)]
-
-        self.outline = []
-        for edge in edges:
-            for other in edges:
-                if edge.opposite(other):
-                    break
-            else:
-                self.outline.append(edge)
-
-        return self.outline
-
-
-def floodfill(start: tuple[int,int], grid: list[list[str]]) -> GardenPlot:
-    # Breath first search for a region
-    sr, sc = start
-    letter = grid[sr][sc]
-
-    rows = len(grid)
-    cols = len(grid[0])
-
-    garden_plot = set()
-    queue = [(sr, sc)]
-    while len(queue):
-        r, c = queue.pop(0)
-        # Need to use a set because the last cell can sometimes be added
-        # multiple times to the queue
-        garden_plot.add((r, c))
-        
-        for dr, dc in [(-1, 0), (0, -1), (1, 0), (0, 1)]:
-            rr = r + dr
-            cc = c + dc
-            if rr < 0 or rr >= rows or cc < 0 or cc >= cols:
-                continue
-
-            cell = (rr, cc)
-            not_in_queue = cell not in queue
-            not_in_garden = cell not in garden_plot
-            if grid[rr][cc] == letter and not_in_garden and not_in_queue:
-                queue.append((rr, cc))
-            
-    return GardenPlot(garden_plot, label=letter)
-
-
-def solve_part1(garden: list[list[str]]) -> int:
-    rows = len(garden)
-    cols = len(garden[0])
-
-    total_cost = 0
-    plots = []
-    for r in range(rows):
-        for c in range(cols):
-            for plot in plots:
-                if plot.contains((r, c)):
-                    break
-            else:
-                plot = floodfill((r,c), garden)
-                plots.append(plot)
-                total_cost += plot.cost()
-
-    return total_cost
-
-
-def solve_part2(garden: list[list[str]]) -> int:
-    rows = len(garden)
-    cols = len(garden[0])
-
-    total_cost = 0
-    plots = []
-    for r in range(rows):
-        for c in range(cols):
-            for plot in plots:
-                if plot.contains((r, c)):
-                    break
-            else:
-                plot = floodfill((r,c), garden)
-                plots.append(plot)
-                total_cost += plot.bulk_cost()
-
-    return total_cost
-
-
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
-
-puzzle_input = parse_file(sys.argv[1])
-
-sol1 = solve_part1(puzzle_input)
-print("part1:", sol1)
-
-sol2 = solve_part2(puzzle_input)
-print("part2:", sol2)
-
+from collections import deque
+from pathlib import Path
+
+# Make the shared aoc package importable when running this file as a script
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from aoc.grid import Grid
+
+def parse_file(filename: str) -> Grid:
+    return Grid.from_file(filename)
+
+
+def label_regions(garden: Grid) -> tuple[list[int],list[int],list[int]]:
+    """
+    Labels the regions with a breadth first search from every cell that
+    isn't labelled yet, counting the area and perimeter while labelling. A
+    side of a cell is on the perimeter when the neighbor has another letter,
+    which includes the OUTSIDE border cells around the garden.
+    Return:
+        label of every flat index, -1 outside the garden
+        area of every label
+        perimeter of every label
+    """
+    cells = garden.cells
+    neighbors = garden.neighbors4
+    labels = [-1] * len(cells)
+    areas = []
+    perimeters = []
+
+    for start in garden.indices():
+        if labels[start] != -1:
+            continue
+
+        label = len(areas)
+        letter = cells[start]
+        labels[start] = label
+
+        area = 0
+        perimeter = 0
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            area += 1
+            for d in neighbors:
+                j = i + d
+                if cells[j] != letter:
+                    perimeter += 1
+                elif labels[j] == -1:
+                    # Labelled when queued so a cell is never queued twice
+                    labels[j] = label
+                    queue.append(j)
+
+        areas.append(area)
+        perimeters.append(perimeter)
+
+    return labels, areas, perimeters
+
+
+def solve_part1(garden: Grid) -> int:
+    _, areas, perimeters = label_regions(garden)
+    return sum(area * perimeter for area, perimeter in zip(areas, perimeters))
+
+
+def solve_part2(garden: Grid) -> int:
+    _, areas, _ = label_regions(garden)
+
+    # TODO: count the sides of each region
+    sides = [-1] * len(areas)
+    return sum(area * side_count for area, side_count in zip(areas, sides))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
+
+    puzzle_input = parse_file(sys.argv[1])
+
+    sol1 = solve_part1(puzzle_input)
+    print("part1:", sol1)
+
+    sol2 = solve_part2(puzzle_input)
+    print("part2:", sol2)
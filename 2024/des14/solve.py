@@ -1,6 +1,5 @@
 import sys
 from copy import deepcopy
-from PIL import Image
 
 
 class Robot:
@@ -137,6 +136,10 @@ def solve_part2(robots: list[Robot], rows: int, cols: int) -> int:
                     found = True
 
         if found:
+            # Pillow is only needed to save the picture of the tree, so don't
+            # require it just to import this day
+            from PIL import Image
+
             img = Image.new("L", (cols, rows))  # mode L = 8-bit grayscale
             img.frombytes(img_bytes)
             img.save(f"{sec}.png")
@@ -146,15 +149,15 @@ def solve_part2(robots: list[Robot], rows: int, cols: int) -> int:
     return -1
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
-
-robots, rows, cols = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-sol1 = solve_part1(deepcopy(robots), rows, cols)
-print("part1:", sol1)
+    robots, rows, cols = parse_file(sys.argv[1])
 
-sol2 = solve_part2(deepcopy(robots), rows, cols)
-print("part2:", sol2)
+    sol1 = solve_part1(deepcopy(robots), rows, cols)
+    print("part1:", sol1)
 
+    sol2 = solve_part2(deepcopy(robots), rows, cols)
+    print("part2:", sol2)
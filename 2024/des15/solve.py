@@ -1,6 +1,9 @@
 import sys
-from copy import deepcopy
-import time
+from pathlib import Path
+
+# Make the shared aoc package importable when running this file as a script
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from aoc.grid import Grid
 
 ROBOT = "@"
 
@@ -20,17 +23,13 @@ UP = "^"
 DOWN = "v"
 
 
-def parse_file(filename: str) -> tuple[list[list[str]],list[str]]:
+def parse_file(filename: str) -> tuple[Grid,list[str]]:
     with open(filename) as fp:
         data = fp.read()
 
     grid_in, moves_in = data.split("\n\n")
 
-    grid = []
-    for i, line in enumerate(grid_in.splitlines()):
-        grid.append([])
-        for c in line:
-            grid[i].append(c)
+    grid = Grid.from_lines(grid_in.splitlines())
 
     moves = []
     for m in moves_in:
@@ -41,12 +40,8 @@ def parse_file(filename: str) -> tuple[list[list[str]],list[str]]:
     return grid, moves
 
 
-def within(row: int, col: int, rows: int, cols: int) -> bool:
-    return 0 <= row < rows and 0 <= col < cols
-
-
-def print_grid(grid: list[list[str]]):
-    print("\n".join("".join(row) for row in grid))
+def print_grid(grid: Grid):
+    print(grid)
 
 
 def move_to_dir(m: str) -> tuple[int,int]:
@@ -64,145 +59,122 @@ def move_to_dir(m: str) -> tuple[int,int]:
     return dir
 
 
-def solve_part1(grid: list[list[str]], moves: list[str]) -> int:
-    rows = len(grid)
-    cols = len(grid[0])
+def move_to_offset(grid: Grid, m: str) -> int:
+    dr, dc = move_to_dir(m)
+    return dr * grid.stride + dc
+
+
+def solve_part1(grid: Grid, moves: list[str]) -> int:
+    robot = grid.find(ROBOT)
 
-    robot = (-1, -1)
-    for r in range(rows):
-        for c in range(cols):
-            if grid[r][c] == ROBOT:
-                robot = (r, c)
+    wall = ord(WALL)
+    box = ord(BOX)
+    empty = ord(EMPTY)
 
-    def move(robot: tuple[int,int], m: str) -> tuple[int,int]:
-        r, c = robot
-        grid[r][c] = EMPTY
+    def move(i: int, m: str) -> int:
+        grid[i] = empty
 
-        dr, dc = move_to_dir(m)
+        d = move_to_offset(grid, m)
 
-        rr = r + dr
-        cc = c + dc
-        if not within(rr, cc, rows, cols):
-            grid[r][c] = ROBOT
-            return r, c
+        j = i + d
+        if not grid.inside(j):
+            grid[i] = ord(ROBOT)
+            return i
 
-        if grid[rr][cc] == WALL:
-            grid[r][c] = ROBOT
-            return r, c
+        if grid[j] == wall:
+            grid[i] = ord(ROBOT)
+            return i
 
-        if grid[rr][cc] == BOX:
+        if grid[j] == box:
             # Find first non-box cell
-            rb = rr
-            cb = cc
-            while within(rb, cb, rows, cols) and grid[rb][cb] == BOX:
-                rb = rb + dr
-                cb = cb + dc
+            jb = j
+            while grid.inside(jb) and grid[jb] == box:
+                jb += d
 
-            if grid[rb][cb] == WALL:
-                grid[r][c] = ROBOT
-                return r, c
+            if grid[jb] == wall:
+                grid[i] = ord(ROBOT)
+                return i
 
             # Move box to the next empty cell. This is the same as moving each
             # box since the boxes are identical. 
-            grid[rr][cc] = EMPTY
-            grid[rb][cb] = BOX
+            grid[j] = empty
+            grid[jb] = box
 
-        r = rr
-        c = cc
-
-        grid[r][c] = ROBOT
-        return r, c
+        grid[j] = ord(ROBOT)
+        return j
 
     for m in moves:
         robot = move(robot, m)
 
     sum_position = 0
-    for r in range(rows):
-        for c in range(cols):
-            if grid[r][c] == BOX:
-                pos = 100 * r + c
-                sum_position += pos
+    for i in grid.find_all(BOX):
+        r, c = grid.position(i)
+        pos = 100 * r + c
+        sum_position += pos
 
     return sum_position
 
 
-def solve_part2(grid_pt1: list[list[str]], moves: list[str]) -> int:
+def solve_part2(grid_pt1: Grid, moves: list[str]) -> int:
     # Prepare for part 2
-    rows = len(grid_pt1)
-    cols = len(grid_pt1[0])
-    robot = (-1, -1)
-    for r in range(rows):
-        for c in range(cols):
-            g = grid_pt1[r][c]
-            if g == WALL:
-                grid_pt1[r][c] = WALL2
-            elif g == BOX:
-                grid_pt1[r][c] = BOX2
-            elif g == EMPTY:
-                grid_pt1[r][c] = EMPTY2
-            elif g == ROBOT:
-                grid_pt1[r][c] = ROBOT + EMPTY
-
-                # Multiply column with two since each cell is double length now
-                robot = (r, c * 2)
+    widened = {
+        WALL: WALL2,
+        BOX: BOX2,
+        EMPTY: EMPTY2,
+        ROBOT: ROBOT + EMPTY,
+    }
 
     # Expand grid so each double cell is it's own item
-    grid = []
-    for i, row in enumerate(grid_pt1):
-        grid.append([])
-        for cell in row:
-            grid[i].append(cell[0])
-            grid[i].append(cell[1])
+    lines = []
+    for r in range(grid_pt1.rows):
+        lines.append("".join(widened[g] for g in grid_pt1.row(r)))
+    grid = Grid.from_lines(lines)
 
-    rows = len(grid)
-    cols = len(grid[0])
+    robot = grid.find(ROBOT)
 
     print_grid(grid)
-    print("robot init", robot)
+    print("robot init", grid.position(robot))
+
+    wall = ord(WALL)
+    empty = ord(EMPTY)
+    boxes = BOX2.encode()
 
-    def move(robot: tuple[int,int], m: str) -> tuple[int,int]:
-        r, c = robot
-        grid[r][c] = EMPTY
+    def move(i: int, m: str) -> int:
+        grid[i] = empty
 
-        dr, dc = move_to_dir(m)
-        print("\nmove", m, dr, dc)
+        d = move_to_offset(grid, m)
+        print("\nmove", m, *move_to_dir(m))
 
-        rr = r + dr
-        cc = c + dc
-        if not within(rr, cc, rows, cols):
-            grid[r][c] = ROBOT
-            print("outside", rr, cc)
-            return r, c
+        j = i + d
+        if not grid.inside(j):
+            grid[i] = ord(ROBOT)
+            print("outside", *grid.position(j))
+            return i
 
-        if grid[rr][cc] == WALL:
-            grid[r][c] = ROBOT
-            print("wall", rr, cc)
-            return r, c
+        if grid[j] == wall:
+            grid[i] = ord(ROBOT)
+            print("wall", *grid.position(j))
+            return i
 
-        if grid[rr][cc] in BOX2:
-            print("box", rr, cc)
+        if grid[j] in boxes:
+            print("box", *grid.position(j))
             if m in [LEFT, RIGHT]:
                 # Find first non-box cell
-                rb = rr
-                cb = cc
-                while within(rb, cb, rows, cols) and grid[rb][cb] in BOX2:
-                    rb = rb + dr
-                    cb = cb + dc
+                jb = j
+                while grid.inside(jb) and grid[jb] in boxes:
+                    jb += d
 
-                print("found not box", rb, cb)
+                print("found not box", *grid.position(jb))
 
-                if grid[rb][cb] == WALL:
-                    grid[r][c] = ROBOT
-                    return r, c
+                if grid[jb] == wall:
+                    grid[i] = ord(ROBOT)
+                    return i
 
-                print("found empty", rb, cb)
+                print("found empty", *grid.position(jb))
 
-                while rb != r or cb != c:
-                    tmp = grid[rb][cb]
-                    grid[rb][cb] = grid[rb + dr][cb + dc]
-                    grid[rb + dr][cb + dc] = tmp
-                    rb -= dr
-                    cb -= dc
+                while jb != i:
+                    grid[jb], grid[jb + d] = grid[jb + d], grid[jb]
+                    jb -= d
 
             elif m in [UP, DOWN]:
                 # IDEAS
@@ -233,11 +205,8 @@ def solve_part2(grid_pt1: list[list[str]], moves: list[str]) -> int:
                 # In which case the robot will move all boxes up one. 
                 pass
 
-        r = rr
-        c = cc
-
-        grid[r][c] = ROBOT
-        return r, c
+        grid[j] = ord(ROBOT)
+        return j
 
     for m in moves[:5]:
         robot = move(robot, m)
@@ -253,15 +222,15 @@ def solve_part2(grid_pt1: list[list[str]], moves: list[str]) -> int:
 
     return -1
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
-
-grid, moves = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-sol1 = solve_part1(deepcopy(grid), moves)
-print("part1:", sol1)
+    grid, moves = parse_file(sys.argv[1])
 
-sol2 = solve_part2(deepcopy(grid), moves)
-print("part2:", sol2)
+    sol1 = solve_part1(grid.copy(), moves)
+    print("part1:", sol1)
 
+    sol2 = solve_part2(grid.copy(), moves)
+    print("part2:", sol2)
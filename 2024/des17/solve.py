@@ -292,17 +292,17 @@ def solve_part2(registers: dict[str,int], program: list[int]) -> int:
     return initial_a
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-registers, program = parse_file(sys.argv[1])
+    registers, program = parse_file(sys.argv[1])
 
-sol1 = solve_part1(registers, program)
-print("part1:", sol1)
-
-t0 = time.time()
-sol2 = solve_part2(registers, program)
-t1 = time.time()
-print("part2:", sol2, f"(finished in {t1 - t0:.4f}s)")
+    sol1 = solve_part1(registers, program)
+    print("part1:", sol1)
 
+    t0 = time.time()
+    sol2 = solve_part2(registers, program)
+    t1 = time.time()
+    print("part2:", sol2, f"(finished in {t1 - t0:.4f}s)")
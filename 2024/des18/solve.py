@@ -1,43 +1,46 @@
 import sys
-from copy import deepcopy
 import time
-from typing import Callable
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+# Make the shared aoc package importable when running this file as a script
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from aoc.grid import Grid
+from aoc.search import a_star as search_a_star
 
 ROWS = 71
 COLS = 71
 MAX_BYTES = 1024
 
-def parse_file(filename: str) -> list[tuple[int,int]]:
+def iter_file(filename: str) -> Iterator[tuple[int,int]]:
+    """Yields the falling bytes one line at a time."""
     with open(filename) as fp:
-        lines = fp.readlines()
-
-    coords = []
-    for line in lines:
-        x, y = line.split(",")
-        # Reverse order to have coords be (row, col)
-        coords.append((int(y), int(x)))
+        for line in fp:
+            if line.strip():
+                x, y = line.split(",")
+                # Reverse order to have coords be (row, col)
+                yield int(y), int(x)
 
-    return coords
 
+def parse_file(filename: str) -> list[tuple[int,int]]:
+    return list(iter_file(filename))
 
-def construct_grid(coords: list[tuple[int,int]]) -> list[list[str]]:
-    grid = []
-    for _ in range(ROWS):
-        grid.append(["."] * COLS)
 
+def construct_grid(coords: Iterable[tuple[int,int]]) -> Grid:
+    grid = Grid(ROWS, COLS)
     for r, c in coords:
-        grid[r][c] = "#"
+        grid.set(r, c, "#")
 
     return grid
 
 
-def print_grid(grid: list[list[str]], path: list[tuple[int,int]] = []):
-    display = deepcopy(grid)
+def print_grid(grid: Grid, path: list[tuple[int,int]] = []):
+    display = grid.copy()
     for r, c in path:
-        display[r][c] = "O"
+        display.set(r, c, "O")
 
-    for row in display:
-        print("".join(row))
+    print(display)
 
 
 def taxicab_distance(pos: tuple[int,int], end: tuple[int,int]) -> int:
@@ -47,60 +50,27 @@ def taxicab_distance(pos: tuple[int,int], end: tuple[int,int]) -> int:
 
 def a_star(start: tuple[int,int], 
            end: tuple[int,int], 
-           grid: list[list[str]],
+           grid: Grid,
            heuristic: Callable[[tuple[int,int],tuple[int,int]],int]) -> list[tuple[int,int]]:
-    # Implementation of A* from:
-    # https://en.wikipedia.org/wiki/A*_search_algorithm#Pseudocode
-    came_from = { start: None }
-    # g_score = cheapest path from start to (r, c)
-    g_score = [ [ float("inf") for _ in range(COLS) ] for __ in range(ROWS) ]
-    # f_score = current best guess at how cheap path is from start to (r, c)
-    f_score = [ [ float("inf") for _ in range(COLS) ] for __ in range(ROWS) ]
-
-    r, c = start
-    g_score[r][c] = 0
-    f_score[r][c] = heuristic(start, end)
-
-    def distance(current: tuple[int,int], neighbor: tuple[int,int]) -> int:
-        return 1
-
-    open_set = [start]
-    while len(open_set) > 0:
-        open_set = sorted(open_set, key=lambda n: f_score[n[0]][n[1]], reverse=True)
-        current = open_set.pop()
-        if current == end:
-            prev = current
-            path = [prev]
-            while (prev := came_from[prev]) is not None:
-                path.append(prev)
-
-            return list(reversed(path))
-
-        r, c = current
-        for dr, dc in [(-1, 0), (0, -1), (1, 0), (0, 1)]:
-            rr = r + dr
-            cc = c + dc
-            if rr < 0 or rr >= ROWS or cc < 0 or cc >= COLS:
-                continue
-
-            if grid[rr][cc] == "#":
-                continue
-
-            neighbor = (rr, cc)
-            tentative_g_score = g_score[r][c] + distance(current, neighbor)
-            if tentative_g_score < g_score[rr][cc]:
-                came_from[neighbor] = current
-                g_score[rr][cc] = tentative_g_score
-                f_score[rr][cc] = tentative_g_score + heuristic(neighbor, end)
-
-                if neighbor not in open_set:
-                    open_set.append(neighbor)
-    
-    return []
-
-
-def solve_part1(coords: list[tuple[int,int]], max_bytes: int = MAX_BYTES) -> int:
-    grid = construct_grid(coords[:max_bytes])
+    # States are flat indices into the grid, and every step costs 1
+    empty = ord(".")
+
+    def neighbors(i: int) -> list[tuple[int,int]]:
+        return [(i + d, 1) for d in grid.neighbors4 if grid[i + d] == empty]
+
+    end_index = grid.index(*end)
+    result = search_a_star(
+        grid.index(*start),
+        neighbors,
+        lambda i: i == end_index,
+        lambda i: heuristic(grid.position(i), end),
+    )
+
+    return [grid.position(i) for i in result.path()]
+
+
+def solve_part1(coords: Iterable[tuple[int,int]], max_bytes: int = MAX_BYTES) -> int:
+    grid = construct_grid(islice(coords, max_bytes))
 
     start = (0, 0)
     end = (ROWS - 1, COLS - 1)
@@ -178,23 +148,68 @@ def solve_part2_binary_search(coords: list[tuple[int,int]]) -> str:
     return ",".join(str(d) for d in reversed(result))
 
 
+def solve_part2_stream(coords: Iterable[tuple[int,int]]) -> str:
+    """
+    Part 2 in one pass over the falling bytes, without keeping them. The
+    path from the top left to the bottom right corner is cut off exactly
+    when a chain of bytes (touching diagonally counts) connects the top or
+    right edge with the bottom or left edge, which union-find on the bytes
+    tracks as they fall.
+    """
+    top_right = ROWS * COLS
+    bottom_left = ROWS * COLS + 1
+    parent = list(range(ROWS * COLS + 2))
+    fallen = bytearray(ROWS * COLS)
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int):
+        parent[find(i)] = find(j)
+
+    for r, c in coords:
+        i = r * COLS + c
+        fallen[i] = 1
+
+        for dr in [-1, 0, 1]:
+            for dc in [-1, 0, 1]:
+                rr, cc = r + dr, c + dc
+                if 0 <= rr < ROWS and 0 <= cc < COLS and fallen[rr * COLS + cc]:
+                    union(i, rr * COLS + cc)
+
+        if r == 0 or c == COLS - 1:
+            union(i, top_right)
+        if r == ROWS - 1 or c == 0:
+            union(i, bottom_left)
+
+        if find(top_right) == find(bottom_left):
+            # Reverse because coordinates are expected on form (col, row)
+            return f"{c},{r}"
+
+    return "-1,-1"
+
+
 def solve_part2(coords: list[tuple[int,int]]) -> str:
     # return solve_part2_linear_brute(coords)
     # return solve_part2_smart_brute(coords)
+    # return solve_part2_stream(coords)
     return solve_part2_binary_search(coords)
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
-
-coords = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-sol1 = solve_part1(coords)
-print("part1:", sol1)
+    coords = parse_file(sys.argv[1])
 
-t0 = time.time()
-sol2 = solve_part2(coords)
-t1 = time.time()
-print("part2:", sol2, f"(elapsed time: {t1 - t0:.4f}s)")
+    sol1 = solve_part1(coords)
+    print("part1:", sol1)
 
+    t0 = time.time()
+    sol2 = solve_part2(coords)
+    t1 = time.time()
+    print("part2:", sol2, f"(elapsed time: {t1 - t0:.4f}s)")
@@ -77,19 +77,19 @@ def solve_part2(options: set[str], patterns: list[str]) -> int:
     return total_count
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
-
-options, patterns = parse_file(sys.argv[1])
-
-t0 = time.time()
-sol1 = solve_part1(options, patterns)
-t1 = time.time()
-print("part1:", sol1, f"(elapsed time: {t1 - t0:.4f})s")
-
-t0 = time.time()
-sol2 = solve_part2(options, patterns)
-t1 = time.time()
-print("part2:", sol2, f"(elapsed time: {t1 - t0:.4f})s")
-
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
+
+    options, patterns = parse_file(sys.argv[1])
+
+    t0 = time.time()
+    sol1 = solve_part1(options, patterns)
+    t1 = time.time()
+    print("part1:", sol1, f"(elapsed time: {t1 - t0:.4f})s")
+
+    t0 = time.time()
+    sol2 = solve_part2(options, patterns)
+    t1 = time.time()
+    print("part2:", sol2, f"(elapsed time: {t1 - t0:.4f})s")
@@ -1,15 +1,20 @@
 import sys
+from itertools import islice
+from typing import Iterable, Iterator
 
-def parse_file(filename: str) -> list[list[int]]:
+# Reports are checked this many at a time by the NumPy versions
+BATCH_SIZE = 100_000
+
+def iter_file(filename: str) -> Iterator[list[int]]:
+    """Yields the reports one line at a time."""
     with open(filename) as fp:
-        lines = fp.readlines()
+        for line in fp:
+            if line.strip():
+                yield [int(d) for d in line.split(" ")]
 
-    puzzle_input = []
-    for line in lines:
-        parsed = [int(d) for d in line.split(" ")]
-        puzzle_input.append(parsed)
 
-    return puzzle_input
+def parse_file(filename: str) -> list[list[int]]:
+    return list(iter_file(filename))
 
 def is_safe_line(line: list[int]) -> bool:
     # If the list is strictly increasing, the last number must be greater
@@ -27,7 +32,35 @@ def is_safe_line(line: list[int]) -> bool:
 
     return True
 
-def solve_part1(puzzle_input: list[list[int]]) -> int:
+def first_bad_level(line: list[int], direction: int) -> int:
+    """
+    Return:
+        The index of the first level that doesn't step 1 to 3 in direction
+        (1 or -1) to the next one, or -1 if the whole line does
+    """
+    for i in range(len(line) - 1):
+        if not 1 <= direction * (line[i+1] - line[i]) <= 3:
+            return i
+
+    return -1
+
+
+def is_safe_with_removal(line: list[int]) -> bool:
+    # Removing a level before i or after i + 1 keeps the bad step between
+    # them, so only those two can make the line safe in that direction
+    for direction in (1, -1):
+        i = first_bad_level(line, direction)
+        if i == -1:
+            return True
+
+        for removed in (i, i + 1):
+            if first_bad_level(line[:removed] + line[removed+1:], direction) == -1:
+                return True
+
+    return False
+
+
+def solve_part1_loops(puzzle_input: Iterable[list[int]]) -> int:
     safe_count = 0 
     for inp in puzzle_input:
         if is_safe_line(inp):
@@ -36,7 +69,7 @@ def solve_part1(puzzle_input: list[list[int]]) -> int:
     return safe_count
 
 
-def solve_part2(puzzle_input: list[list[int]]) -> int:
+def solve_part2_brute(puzzle_input: Iterable[list[int]]) -> int:
     def is_safe_sub(line: list[int]) -> bool:
         for i in range(len(line)):
             sub_line = line[:i] + line[i+1:]
@@ -53,15 +86,98 @@ def solve_part2(puzzle_input: list[list[int]]) -> int:
     return safe_count
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
+def solve_part2_loops(puzzle_input: Iterable[list[int]]) -> int:
+    return sum(1 for line in puzzle_input if is_safe_with_removal(line))
+
+
+def iter_batches(puzzle_input: Iterable[list[int]], batch_size: int = BATCH_SIZE):
+    """
+    Yields the reports as 2D NumPy arrays, one for each report length in
+    every batch_size reports, so an iterator of reports is never all in
+    memory at once.
+    """
+    import numpy as np
+
+    reports = iter(puzzle_input)
+    while batch := list(islice(reports, batch_size)):
+        by_length: dict[int,list[list[int]]] = {}
+        for line in batch:
+            by_length.setdefault(len(line), []).append(line)
+
+        for lines in by_length.values():
+            yield np.array(lines, dtype=np.int64)
+
+
+def safe_steps(reports, direction: int):
+    """Whether each step of each report goes 1 to 3 in direction (1 or -1)."""
+    import numpy as np
+
+    steps = direction * np.diff(reports, axis=1)
+    return (steps >= 1) & (steps <= 3)
+
+
+def safe_reports(reports):
+    """Whether each report (a row of reports) is safe."""
+    return safe_steps(reports, 1).all(axis=1) | safe_steps(reports, -1).all(axis=1)
+
+
+def safe_reports_with_removal(reports):
+    """
+    Whether each report is safe with at most one level removed. Like
+    is_safe_with_removal, only the two levels around the first bad step in
+    each direction are tried, so every report is checked a fixed number of
+    times whatever its length.
+    """
+    import numpy as np
+
+    n, length = reports.shape
+    if length <= 2:
+        return np.ones(n, dtype=bool)
+
+    columns = np.arange(length)
+    safe = np.zeros(n, dtype=bool)
+    for direction in (1, -1):
+        bad = ~safe_steps(reports, direction)
+        first_bad = bad.argmax(axis=1)
+        safe |= ~bad.any(axis=1)
+
+        for removed in (first_bad, first_bad + 1):
+            kept = columns != removed[:, None]
+            shorter = reports[kept].reshape(n, length - 1)
+            safe |= safe_steps(shorter, direction).all(axis=1)
+
+    return safe
+
+
+def solve_part1_numpy(puzzle_input: Iterable[list[int]]) -> int:
+    return sum(int(safe_reports(reports).sum()) for reports in iter_batches(puzzle_input))
+
+
+def solve_part2_numpy(puzzle_input: Iterable[list[int]]) -> int:
+    return sum(int(safe_reports_with_removal(reports).sum())
+               for reports in iter_batches(puzzle_input))
+
+
+def solve_part1(puzzle_input: Iterable[list[int]]) -> int:
+    # return solve_part1_numpy(puzzle_input)
+    return solve_part1_loops(puzzle_input)
+
+
+def solve_part2(puzzle_input: Iterable[list[int]]) -> int:
+    # return solve_part2_brute(puzzle_input)
+    # return solve_part2_numpy(puzzle_input)
+    return solve_part2_loops(puzzle_input)
+
 
-puzzle_input = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-sol1 = solve_part1(puzzle_input)
-print("part1:", sol1)
+    puzzle_input = parse_file(sys.argv[1])
 
-sol2 = solve_part2(puzzle_input)
-print("part2:", sol2)
+    sol1 = solve_part1(puzzle_input)
+    print("part1:", sol1)
 
+    sol2 = solve_part2(puzzle_input)
+    print("part2:", sol2)
@@ -1,6 +1,10 @@
 import sys
 import time
-from copy import deepcopy
+from pathlib import Path
+
+# Make the shared aoc package importable when running this file as a script
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from aoc.grid import Grid
 
 
 START = "S"
@@ -8,48 +12,32 @@ END = "E"
 WALL = "#"
 TRACK = "."
 
-ROWS = -1
-COLS = -1
-
-
-def within(row: int, col: int) -> bool:
-    return row >= 0 and row < ROWS and col >= 0 and col < COLS
-
-
-def parse_file(filename: str) -> list[list[str]]:
-    global ROWS, COLS
 
-    with open(filename) as fp:
-        lines = fp.readlines()
+def parse_file(filename: str) -> Grid:
+    return Grid.from_file(filename)
 
-    grid = [list(line.strip()) for line in lines]
-    ROWS = len(grid)
-    COLS = len(grid[0])
-    return grid
 
-
-def print_grid(grid: list[list[str]], 
+def print_grid(grid: Grid, 
                path: list[tuple[int,int]] = [],
                cheat: list[tuple[int,int]] = []):
     assert len(cheat) == 0 or len(cheat) == 2
 
-    display = deepcopy(grid)
+    display = grid.copy()
     for r, c in path:
-        display[r][c] = "O"
+        display.set(r, c, "O")
 
     for i, (r, c) in enumerate(cheat):
-        display[r][c] = str(i + 1)
+        display.set(r, c, str(i + 1))
 
-    for row in display:
-        print("".join(row))
+    print(display)
 
 
-def find_racetrack(grid: list[list[str]],
+def find_racetrack(grid: Grid,
                    start: tuple[int,int],
                    end: tuple[int,int]
         ) -> tuple[list[tuple[int,int]],list[list[float]]]:
     # Find distances from start to each track cell
-    distances = [ [ float("inf") ] * COLS for _ in range(ROWS) ]
+    distances = [ [ float("inf") ] * grid.cols for _ in range(grid.rows) ]
 
     path = []
     node = start
@@ -61,10 +49,10 @@ def find_racetrack(grid: list[list[str]],
         for dr, dc in [(-1, 0), (0, 1), (1, 0), (0, -1)]:
             rr = r + dr
             cc = c + dc
-            if not within(rr, cc):
+            if not grid.within(rr, cc):
                 continue
 
-            if grid[rr][cc] == WALL:
+            if grid.at(rr, cc) == WALL:
                 continue
 
             # Don't go backwards
@@ -86,16 +74,9 @@ def manhattan_distance(start: tuple[int,int], end: tuple[int,int]) -> int:
     return abs(end[0] - start[0]) + abs(end[1] - start[1])
 
 
-def solve_part1(grid: list[list[str]]) -> int:
-    start = (-1, -1)
-    end = (-1, -1)
-    for r in range(ROWS):
-        for c in range(COLS):
-            g = grid[r][c]
-            if g == START:
-                start = (r, c)
-            elif g == END:
-                end = (r, c)
+def solve_part1(grid: Grid) -> int:
+    start = grid.position(grid.find(START))
+    end = grid.position(grid.find(END))
 
     path, distances = find_racetrack(grid, start, end)
 
@@ -108,12 +89,12 @@ def solve_part1(grid: list[list[str]]) -> int:
             # Cheat end
             r2 = r1 + dr
             c2 = c1 + dc
-            if not within(r1, c1) or not within(r2, c2):
+            if not grid.within(r1, c1) or not grid.within(r2, c2):
                 continue
 
             # It doesn't make sense to disable collision if the first cell
             # is not a wall
-            if grid[r1][c1] != WALL:
+            if grid.at(r1, c1) != WALL:
                 continue
 
             # This ensures the second cheat is later in the path so we don't
@@ -136,35 +117,27 @@ def solve_part1(grid: list[list[str]]) -> int:
     return total_count
 
 
-def solve_part2(grid: list[list[str]]) -> int:
-    start = (-1, -1)
-    end = (-1, -1)
-    for r in range(ROWS):
-        for c in range(COLS):
-            g = grid[r][c]
-            if g == START:
-                start = (r, c)
-            elif g == END:
-                end = (r, c)
+def solve_part2(grid: Grid) -> int:
+    start = grid.position(grid.find(START))
+    end = grid.position(grid.find(END))
 
     path, distances = find_racetrack(grid, start, end)
 
+    wall = ord(WALL)
+    track = [grid.position(i) for i in grid.indices() if grid[i] != wall]
+
     save_counts = {}
     for i, node in enumerate(path):
         path_after = set(path[i:])
 
         for cheat_length in range(1, 21):
             cheat_ends = []
-            for r in range(ROWS):
-                for c in range(COLS):
-                    if grid[r][c] == WALL:
-                        continue
+            for r, c in track:
+                if (r, c) not in path_after:
+                    continue
 
-                    if (r, c) not in path_after:
-                        continue
-
-                    if manhattan_distance(node, (r, c)) == cheat_length:
-                        cheat_ends.append((r, c))
+                if manhattan_distance(node, (r, c)) == cheat_length:
+                    cheat_ends.append((r, c))
 
             r, c = node
             for cheat_end in cheat_ends:
@@ -183,19 +156,19 @@ def solve_part2(grid: list[list[str]]) -> int:
     return total_count
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
-
-grid = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-t0 = time.time()
-sol1 = solve_part1(deepcopy(grid))
-t1 = time.time()
-print("part1:", sol1, f"(elapsed time: {t1 - t0:.3f}s)")
+    grid = parse_file(sys.argv[1])
 
-t0 = time.time()
-sol2 = solve_part2(deepcopy(grid))
-t1 = time.time()
-print("part2:", sol2, f"(elapsed time: {t1 - t0:.3f}s)")
+    t0 = time.time()
+    sol1 = solve_part1(grid.copy())
+    t1 = time.time()
+    print("part1:", sol1, f"(elapsed time: {t1 - t0:.3f}s)")
 
+    t0 = time.time()
+    sol2 = solve_part2(grid.copy())
+    t1 = time.time()
+    print("part2:", sol2, f"(elapsed time: {t1 - t0:.3f}s)")
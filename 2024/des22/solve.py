@@ -1,17 +1,22 @@
 import sys
 import time
 from pprint import pprint
+from typing import Iterable, Iterator
 
 
 MODULUS = 16777216
 
 
-def parse_file(filename: str) -> list[int]:
+def iter_file(filename: str) -> Iterator[int]:
+    """Yields the initial secret of each buyer one line at a time."""
     with open(filename) as fp:
-        lines = fp.readlines()
+        for line in fp:
+            if line.strip():
+                yield int(line.strip())
+
 
-    numbers = [int(d.strip()) for d in lines]
-    return numbers
+def parse_file(filename: str) -> list[int]:
+    return list(iter_file(filename))
 
 
 def mix(secret: int, mixin: int) -> int:
@@ -39,19 +44,21 @@ def evolve_once(secret: int) -> int:
     return secret
 
 
-def solve_part1(numbers: list[int]) -> int:
-    secrets = []
+def solve_part1(numbers: Iterable[int]) -> int:
+    total = 0
     for n in numbers:
         secret = n
         for _ in range(2000):
             secret = evolve_once(secret)
-        secrets.append(secret)
+        total += secret
 
-    return sum(secrets)
+    return total
 
 
-def solve_part2(numbers: list[int]) -> int:
-    all_quadruplets = []
+def solve_part2(numbers: Iterable[int]) -> int:
+    # The sums are added up buyer by buyer, so the memory use doesn't grow
+    # with the number of buyers
+    sums = {}
     for initial_secret in numbers:
         secret = initial_secret
 
@@ -79,10 +86,6 @@ def solve_part2(numbers: list[int]) -> int:
                 if last_four not in quadruplets:
                     quadruplets[last_four] = price
 
-        all_quadruplets.append(quadruplets)
-
-    sums = {}
-    for quadruplets in all_quadruplets:
         for last_four, price in quadruplets.items():
             sums[last_four] = sums.get(last_four, 0) + price
 
@@ -90,19 +93,19 @@ def solve_part2(numbers: list[int]) -> int:
     return max_sum
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
-
-numbers = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-t0 = time.time()
-sol1 = solve_part1(numbers)
-t1 = time.time()
-print("part1:", sol1, f"(elapsed time: {t1 - t0:.3f}s)")
+    numbers = parse_file(sys.argv[1])
 
-t0 = time.time()
-sol2 = solve_part2(numbers)
-t1 = time.time()
-print("part2:", sol2, f"(elapsed time: {t1 - t0:.3f}s)")
+    t0 = time.time()
+    sol1 = solve_part1(numbers)
+    t1 = time.time()
+    print("part1:", sol1, f"(elapsed time: {t1 - t0:.3f}s)")
 
+    t0 = time.time()
+    sol2 = solve_part2(numbers)
+    t1 = time.time()
+    print("part2:", sol2, f"(elapsed time: {t1 - t0:.3f}s)")
@@ -1,72 +1,187 @@
-import sys
+from __future__ import annotations
+import mmap
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Every instruction in one alternation, so the memory is only scanned once.
+# The last group that matched (lastindex) tells which instruction it was.
+INSTRUCTION = re.compile(rb"mul\((\d{1,3}),(\d{1,3})\)|(do)\(\)|(don't)\(\)")
+MUL, DO, DONT = 2, 3, 4
+# mul(123,456)
+LONGEST_INSTRUCTION = 12
+
+# Files larger than this are scanned in chunks of CHUNK_SIZE in a process pool
+PARALLEL_SIZE = 256 << 20
+CHUNK_SIZE = 64 << 20
+
+
+class Summary:
+    """
+    The sums of the mul instructions in a part of the memory, in a form where
+    the summaries of consecutive parts can be merged without knowing whether
+    mul was enabled at the start of each part.
+
+    head is the sum before the first do() or don't(), which depends on the
+    state coming into the part. enabled and disabled are the sums after it,
+    first and last are the states set by the first and the last do() or
+    don't() (None if there are none).
+    """
+
+    def __init__(self, head: int = 0, enabled: int = 0, disabled: int = 0,
+                 first: bool | None = None, last: bool | None = None):
+        self.head = head
+        self.enabled = enabled
+        self.disabled = disabled
+        self.first = first
+        self.last = last
+
+    def __repr__(self) -> str:
+        return f"Summary(head={self.head}, enabled={self.enabled}, disabled={self.disabled}, "\
+               f"first={self.first}, last={self.last})"
+
+    def merge(self, other: Summary) -> Summary:
+        """The summary of this part followed directly by other."""
+        if self.last is None:
+            # Nothing sets the state before other's first do() or don't()
+            return Summary(self.head + other.head, other.enabled, other.disabled,
+                           other.first, other.last)
+
+        enabled, disabled = self.enabled + other.enabled, self.disabled + other.disabled
+        if self.last:
+            enabled += other.head
+        else:
+            disabled += other.head
+
+        last = self.last if other.last is None else other.last
+        return Summary(self.head, enabled, disabled, self.first, last)
+
+    def totals(self) -> tuple[int,int]:
+        """
+        Return:
+            The enabled and disabled sums of the whole program, which starts
+            with mul enabled
+        """
+        return self.head + self.enabled, self.disabled
+
+
+def scan(memory: bytes | mmap.mmap, start: int = 0, end: int | None = None) -> Summary:
+    """
+    Runs the instructions that start in memory[start:end] in a single pass,
+    keeping track of whether mul is enabled by do() and don't(). The scan
+    reads past end to finish the last instruction. No instruction can
+    start inside another, so scanning from start finds the same ones as
+    scanning the whole memory and every instruction belongs to exactly one
+    chunk.
+    """
+    end = len(memory) if end is None else end
+    summary = Summary()
+    enabled = None
+
+    stop = min(end + LONGEST_INSTRUCTION - 1, len(memory))
+    for match in INSTRUCTION.finditer(memory, start, stop):
+        if match.start() >= end:
+            break
+
+        instruction = match.lastindex
+        if instruction == MUL:
+            product = int(match[1]) * int(match[2])
+            if enabled is None:
+                summary.head += product
+            elif enabled:
+                summary.enabled += product
+            else:
+                summary.disabled += product
+        else:
+            enabled = instruction == DO
+            if summary.first is None:
+                summary.first = enabled
+
+    summary.last = enabled
+    return summary
+
+
+def map_file(filename: str) -> mmap.mmap | bytes:
+    with open(filename, "rb") as fp:
+        try:
+            return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return b""
+
+
+_worker_memory: mmap.mmap | bytes | None = None
+
+
+def init_worker(filename: str):
+    global _worker_memory
+    _worker_memory = map_file(filename)
+
+
+def scan_in_worker(chunk: tuple[int,int]) -> Summary:
+    assert _worker_memory is not None, "init_worker has not been run"
+    return scan(_worker_memory, *chunk)
+
+
+def scan_parallel(filename: str, chunk_size: int = CHUNK_SIZE,
+                  jobs: int | None = None) -> Summary:
+    """
+    Scans the file in chunks of chunk_size bytes in a process pool with jobs
+    workers (default: one per cpu). Each worker maps the file itself, so only
+    the chunk boundaries and the summaries are sent between processes. The
+    summaries come back in order and are merged from left to right.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    size = os.path.getsize(filename)
+    chunks = [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+    summary = Summary()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(filename,)) as executor:
+        for chunk_summary in executor.map(scan_in_worker, chunks):
+            summary = summary.merge(chunk_summary)
+
+    return summary
 
-def parse_file(filename: str) -> str:
-    with open(filename) as fp:
-        content = fp.read()
-
-    return content
-
-def solve_part1(puzzle_input: str) -> int:
-    pattern = r"mul\((\d{1,3}),(\d{1,3})\)"
-    matches = re.findall(pattern, puzzle_input)
-
-    total = 0
-    for a, b in matches:
-        total += int(a) * int(b)
-
-    return total
-
-
-def solve_part2(puzzle_input: str) -> int:
-    MUL_START = "mul("
-    DO = "do()"
-    DONT = "don't()"
 
-    do_state = True
-    instructions = []
-    
-    i = 0
-    while i < len(puzzle_input):
+def parse_file(filename: str) -> str:
+    # The parts map the file themselves, so the scan is in their times and
+    # the memory is never read into a string of its own
+    return filename
 
-        if puzzle_input[i:i+len(DO)] == DO:
-            do_state = True
-        elif puzzle_input[i:i+len(DONT)] == DONT:
-            do_state = False
-        elif puzzle_input[i:i+len(MUL_START)] == MUL_START:
-            i += len(MUL_START)
-            j = i
-            while puzzle_input[j] in "0123456789,":
-                j += 1
 
-            # the mul expression must end with a closing parenthesis
-            if puzzle_input[j] != ")":
-                continue
+def run_program(filename: str) -> Summary:
+    if os.path.getsize(filename) > PARALLEL_SIZE:
+        return scan_parallel(filename)
 
-            # subtract 1 because the closing parenthesis is included at j
-            arguments = puzzle_input[i:j]
-            a, b = arguments.split(",")
-            instructions.append((do_state, int(a), int(b)))
+    memory = map_file(filename)
+    try:
+        return scan(memory)
+    finally:
+        if isinstance(memory, mmap.mmap):
+            memory.close()
 
-        i += 1
 
-    total = 0
-    for do, a, b in instructions:
-        if do:
-            total += a * b
+def solve_part1(filename: str) -> int:
+    enabled_sum, disabled_sum = run_program(filename).totals()
+    return enabled_sum + disabled_sum
 
-    return total
 
+def solve_part2(filename: str) -> int:
+    enabled_sum, _ = run_program(filename).totals()
+    return enabled_sum
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
 
-puzzle_input = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-sol1 = solve_part1(puzzle_input)
-print("part1:", sol1)
+    puzzle_input = parse_file(sys.argv[1])
 
-sol2 = solve_part2(puzzle_input)
-print("part2:", sol2)
+    sol1 = solve_part1(puzzle_input)
+    print("part1:", sol1)
 
+    sol2 = solve_part2(puzzle_input)
+    print("part2:", sol2)
@@ -1,133 +1,181 @@
-from os import PRIO_USER
 import sys
+from pathlib import Path
 
-def parse_file(filename: str) -> list[list[str]]:
-    with open(filename) as fp:
-        puzzle = [list(l.strip()) for l in fp.readlines()]
+# Make the shared aoc package importable when running this file as a script
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from aoc.automaton import AhoCorasick
+from aoc.grid import Grid
 
-    return puzzle
+XMAS = "XMAS"
 
 
-def solve_part1(puzzle_input: list[list[str]]) -> int:
-    xmas = list("XMAS")
-    xmas_count = 0
-
-    rows = len(puzzle_input)
-    cols = len(puzzle_input[0])
+def parse_file(filename: str) -> Grid:
+    # With a border as wide as the word, searching from any cell never needs
+    # a bounds check
+    return Grid.from_file(filename, border=len(XMAS) - 1)
 
-    for r in range(rows):
-        for c in range(cols):
-            current = puzzle_input[r][c]
 
-            # We only need to check places starting with X because we check in 
-            # every direction.
-            if current != "X":
-                continue
+def solve_part1_loops(puzzle_input: Grid) -> int:
+    xmas = XMAS.encode()
+    cells = puzzle_input.cells
+    xmas_count = 0
 
-            # right
-            for i in range(4):
-                if c + i >= cols: break
-                if puzzle_input[r][c + i] != xmas[i]: break
-            else:
-                xmas_count += 1
-            # left
-            for i in range(4):
-                if c - i < 0: break
-                if puzzle_input[r][c - i] != xmas[i]: break
-            else:
-                xmas_count += 1
-            # down
-            for i in range(4):
-                if r + i >= rows: break
-                if puzzle_input[r + i][c] != xmas[i]: break
-            else:
-                xmas_count += 1
-            # up
-            for i in range(4):
-                if r - i < 0: break
-                if puzzle_input[r - i][c] != xmas[i]: break
-            else:
-                xmas_count += 1
-            # diagonal down right
-            for i in range(4):
-                if r + i >= rows or c + i >= cols: break
-                if puzzle_input[r + i][c + i] != xmas[i]: break
-            else:
-                xmas_count += 1
-            # diagonal down left
-            for i in range(4):
-                if r + i >= rows or c - i < 0: break
-                if puzzle_input[r + i][c - i] != xmas[i]: break
-            else:
-                xmas_count += 1
-            # diagonal up right
-            for i in range(4):
-                if r - i < 0 or c + i >= cols: break
-                if puzzle_input[r - i][c + i] != xmas[i]: break
-            else:
-                xmas_count += 1
-            # diagonal up left
-            for i in range(4):
-                if r - i < 0 or c - i < 0: break
-                if puzzle_input[r - i][c - i] != xmas[i]: break
+    # We only need to check places starting with X because we check in 
+    # every direction.
+    for i in puzzle_input.find_all("X"):
+        for d in puzzle_input.neighbors8:
+            for k in range(1, len(xmas)):
+                if cells[i + k * d] != xmas[k]: break
             else:
                 xmas_count += 1
 
     return xmas_count
 
 
-def solve_part2(puzzle_input: list[list[str]]) -> int:
+def solve_part2_loops(puzzle_input: Grid) -> int:
+    cells = puzzle_input.cells
+    s = puzzle_input.stride
     xmas_count = 0
 
-    rows = len(puzzle_input)
-    cols = len(puzzle_input[0])
-
-    for r in range(rows):
-        for c in range(cols):
-            current = puzzle_input[r][c]
-
-            if current != "A":
-                continue
-
-            # Possible patterns
-            #  (1)   (2)   (3)   (4)
-            #  M M   M S   S S   S M
-            #   A     A     A     A
-            #  S S   M S   M M   S M
-
-            # top left, top right, bot left, bot right
-            indices = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-            patterns = [
-                ["M", "M", "S", "S"],  # (1)
-                ["M", "S", "M", "S"],  # (2)
-                ["S", "S", "M", "M"],  # (3)
-                ["S", "M", "S", "M"],  # (4)
-            ]
-            
-            for pattern in patterns:
-                for i, (dr, dc) in enumerate(indices):
-                    rr = r + dr
-                    cc = c + dc 
-                    if rr >= rows or rr < 0 or cc >= cols or cc < 0:
-                        break
-
-                    if puzzle_input[rr][cc] != pattern[i]:
-                        break
-                else:
-                    xmas_count += 1
+    # Possible patterns
+    #  (1)   (2)   (3)   (4)
+    #  M M   M S   S S   S M
+    #   A     A     A     A
+    #  S S   M S   M M   S M
+
+    # top left, top right, bot left, bot right
+    corners = (-s - 1, -s + 1, s - 1, s + 1)
+    patterns = {
+        b"MMSS",  # (1)
+        b"MSMS",  # (2)
+        b"SSMM",  # (3)
+        b"SMSM",  # (4)
+    }
+
+    for i in puzzle_input.find_all("A"):
+        if bytes(cells[i + d] for d in corners) in patterns:
+            xmas_count += 1
 
     return xmas_count
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
+# (row, column) steps in the same order as Grid.neighbors8
+DIRECTIONS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+
+def count_word_numpy(puzzle_input: Grid, word: str) -> int:
+    """
+    Counts word in every direction with NumPy. For each direction the array
+    is sliced once per letter, shifted by that many steps, and compared with
+    the letter, so each comparison covers every start cell at once. The
+    start cells are limited to where the whole word fits, so the word may be
+    longer than the border.
+
+    Return:
+        The number of times word appears, in all eight directions
+    """
+    import numpy as np
+
+    letters = puzzle_input.numpy()
+    rows, cols = letters.shape
+    span = len(word) - 1
+    count = 0
+
+    for dr, dc in DIRECTIONS:
+        r0, r1 = max(0, -dr * span), rows - max(0, dr * span)
+        c0, c1 = max(0, -dc * span), cols - max(0, dc * span)
+        if r0 >= r1 or c0 >= c1:
+            continue
+
+        found = np.ones((r1 - r0, c1 - c0), dtype=bool)
+        matches = np.empty_like(found)
+        for k, letter in enumerate(word.encode()):
+            shifted = letters[r0 + k * dr:r1 + k * dr, c0 + k * dc:c1 + k * dc]
+            np.equal(shifted, letter, out=matches)
+            found &= matches
+        count += int(np.count_nonzero(found))
+
+    return count
+
+
+def count_x_mas_numpy(puzzle_input: Grid) -> int:
+    """
+    Counts the X-shaped MAS patterns of part 2 with NumPy. Both diagonals
+    through an A must read MAS or SAM, so each diagonal is checked on its
+    own with the four corner slices.
+    """
+    import numpy as np
+
+    letters = puzzle_input.numpy()
+    m, a, s = (ord(letter) for letter in "MAS")
+
+    top_left, top_right = letters[:-2, :-2], letters[:-2, 2:]
+    bot_left, bot_right = letters[2:, :-2], letters[2:, 2:]
+
+    falling = ((top_left == m) & (bot_right == s)) | ((top_left == s) & (bot_right == m))
+    rising = ((bot_left == m) & (top_right == s)) | ((bot_left == s) & (top_right == m))
+    found = (letters[1:-1, 1:-1] == a) & falling & rising
+
+    return int(np.count_nonzero(found))
+
+
+def grid_lines(puzzle_input: Grid) -> list[str]:
+    """
+    Every row, column, falling diagonal and rising diagonal of the grid as a
+    string, each both forward and reversed. A word found in these strings is
+    a word found in one of the eight directions.
+    """
+    rows = [puzzle_input.row(r) for r in range(puzzle_input.rows)]
+    n_rows, n_cols = puzzle_input.rows, puzzle_input.cols
+
+    lines = rows + ["".join(column) for column in zip(*rows)]
+    # Falling diagonals have a constant c - r, rising ones a constant c + r
+    for k in range(-(n_rows - 1), n_cols):
+        lines.append("".join(rows[r][r + k] for r in range(max(0, -k), min(n_rows, n_cols - k))))
+    for k in range(n_rows + n_cols - 1):
+        lines.append("".join(rows[r][k - r] for r in range(max(0, k - n_cols + 1), min(n_rows, k + 1))))
+
+    return lines + [line[::-1] for line in lines]
+
+
+def count_words(puzzle_input: Grid, words: list[str]) -> dict[str,int]:
+    """
+    Counts every word in all eight directions with one pass of an
+    Aho-Corasick automaton over the lines of the grid. The lines are joined
+    with newlines, which never match a letter, so no word runs across two of
+    them. Like part 1, palindromes are counted once per direction.
+
+    Return:
+        The number of times each word appears
+    """
+    return AhoCorasick(words).count("\n".join(grid_lines(puzzle_input)))
+
+
+def solve_part1(puzzle_input: Grid) -> int:
+    # return count_word_numpy(puzzle_input, XMAS)
+    return solve_part1_loops(puzzle_input)
+
+
+def solve_part2(puzzle_input: Grid) -> int:
+    # return count_x_mas_numpy(puzzle_input)
+    return solve_part2_loops(puzzle_input)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"{sys.argv[0]} [input file] [words...]")
+        exit(1)
 
-puzzle_input = parse_file(sys.argv[1])
+    puzzle_input = parse_file(sys.argv[1])
 
-sol1 = solve_part1(puzzle_input)
-print("part1:", sol1)
+    # With a list of words, count those instead of solving the puzzle
+    if len(sys.argv) > 2:
+        for word, count in count_words(puzzle_input, sys.argv[2:]).items():
+            print(f"{word}:", count)
+        exit(0)
 
-sol2 = solve_part2(puzzle_input)
-print("part2:", sol2)
+    sol1 = solve_part1(puzzle_input)
+    print("part1:", sol1)
 
+    sol2 = solve_part2(puzzle_input)
+    print("part2:", sol2)
@@ -1,108 +1,119 @@
 import sys
+from functools import cmp_to_key
+from typing import Iterable, Iterator, TextIO
 
-def parse_file(filename: str) -> tuple[list[tuple[int,int]], list[list[int]]]:
-    with open(filename) as fp:
-        lines = fp.readlines()
-
+def parse_rules(fp: TextIO) -> list[tuple[int,int]]:
+    # Reads up to and including the empty line after the rules
     rules = []
-
-    line_index = 0
-    while line_index < len(lines):
-        line = lines[line_index].strip()
+    for line in fp:
+        line = line.strip()
         if line == "":
-            # End of rules
-            line_index += 1
             break
 
         a, b = line.split("|")
         rules.append((int(a), int(b)))
-        line_index += 1
 
-    pages = []
-    while line_index < len(lines):
-        numbers = lines[line_index].split(",")
-        pages.append(list(int(p) for p in numbers))
-        line_index += 1
+    return rules
 
-    return rules, pages
 
+def iter_updates(fp: TextIO) -> Iterator[list[int]]:
+    with fp:
+        for line in fp:
+            if line.strip():
+                yield [int(p) for p in line.split(",")]
 
-def solve_part1(rules: list[tuple[int,int]], pages: list[list[int]]) -> int:
-    def check_valid_order(update: list[int]) -> bool:
-        for i in range(len(update)):
-            n = update[i]
-            before_rules = {a for a, _ in filter(lambda rule: n == rule[1], rules)}
-            after_rules = {b for _, b in filter(lambda rule: n == rule[0], rules)}
 
-            for j in range(len(update)):
-                m = update[j]
+def iter_file(filename: str) -> tuple[list[tuple[int,int]], Iterator[list[int]]]:
+    """
+    Reads the rules, which are needed before any update can be checked, and
+    returns them together with an iterator that yields the updates one line
+    at a time. The file is closed when the iterator is exhausted.
+    """
+    fp = open(filename)
+    rules = parse_rules(fp)
+    return rules, iter_updates(fp)
 
-                violate_after = j < i and m in after_rules
-                violate_before = j > i and m in before_rules
-                if violate_before or violate_after:
-                    return False
 
-        return True
+def parse_file(filename: str) -> tuple[list[tuple[int,int]], list[list[int]]]:
+    rules, updates = iter_file(filename)
+    return rules, list(updates)
 
-    middle_sum = 0
-    for update in pages:
-        if check_valid_order(update):
-            middle = update[len(update) // 2]
-            middle_sum += middle
 
-    return middle_sum
+def rule_index(rules: list[tuple[int,int]]) -> dict[int,set[int]]:
+    """
+    Return:
+        for every page, the set of pages that must come after it
+    """
+    after = {}
+    for a, b in rules:
+        after.setdefault(a, set()).add(b)
+
+    return after
 
 
-def solve_part2(rules: list[tuple[int,int]], pages: list[list[int]]) -> int:
-    def check_valid_order(update_in: list[int]) -> tuple[list[int], bool]:
-        update = update_in.copy()
-        any_modifications = False
+def is_valid_order(update: list[int], after: dict[int,set[int]]) -> bool:
+    """
+    The rules order every pair of pages in an update (sort_update relies on
+    this too), so the update is in order exactly when every page must come
+    before the next one. That is one set lookup per page, however many
+    rules there are.
+    """
+    for a, b in zip(update, update[1:]):
+        if b not in after.get(a, ()):
+            return False
 
-        # Variation of bubble sort
-        swapped = True
-        while swapped:
-            swapped = False
-            for i in range(len(update)):
-                n = update[i]
-                before_rules = {a for a, _ in filter(lambda rule: n == rule[1], rules)}
-                after_rules = {b for _, b in filter(lambda rule: n == rule[0], rules)}
+    return True
 
-                for j in range(len(update)):
-                    m = update[j]
 
-                    violate_after = j < i and m in after_rules
-                    violate_before = j > i and m in before_rules
-                    if violate_before or violate_after:
-                        any_modifications = True
-                        
-                        tmp = update[j]
-                        update[j] = update[i]
-                        update[i] = tmp
-                        swapped = True
+def sort_update(update: list[int], after: dict[int,set[int]]) -> list[int]:
+    def compare(a: int, b: int) -> int:
+        if b in after.get(a, ()):
+            return -1
+        if a in after.get(b, ()):
+            return 1
+        return 0
 
-                        break
+    return sorted(update, key=cmp_to_key(compare))
 
-        return update, any_modifications
+
+def solve_part1(rules: list[tuple[int,int]], pages: Iterable[list[int]]) -> int:
+    after = rule_index(rules)
 
     middle_sum = 0
     for update in pages:
-        update_sorted, changed = check_valid_order(update)
-        if changed:
-            middle = update_sorted[len(update) // 2]
+        if is_valid_order(update, after):
+            middle = update[len(update) // 2]
             middle_sum += middle
 
     return middle_sum
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
+def solve_part2(rules: list[tuple[int,int]], pages: Iterable[list[int]]) -> int:
+    after = rule_index(rules)
+
+    middle_sum = 0
+    for update in pages:
+        if is_valid_order(update, after):
+            continue
+
+        # The rules order every pair of pages in an update, so sorting with
+        # them as the comparison gives the one correct order
+        update_sorted = sort_update(update, after)
+        middle = update_sorted[len(update) // 2]
+        middle_sum += middle
+
+    return middle_sum
+
 
-rules, pages = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-sol1 = solve_part1(rules, pages)
-print("part1:", sol1)
+    rules, pages = parse_file(sys.argv[1])
 
-sol2 = solve_part2(rules, pages)
-print("part2:", sol2)
+    sol1 = solve_part1(rules, pages)
+    print("part1:", sol1)
 
+    sol2 = solve_part2(rules, pages)
+    print("part2:", sol2)
@@ -1,223 +1,439 @@
+import os
 import sys
-from copy import deepcopy
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
-def parse_file(filename: str) -> list[list[str]]:
-    with open(filename) as fp:
-        board = [ 
-            list(line.strip()) for line in fp.readlines()
-        ]
+# Make the shared aoc package importable when running this file as a script
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from aoc.grid import Grid
 
-    return board
+OBSTACLE = ord("#")
+EMPTY = ord(".")
 
+# Same order as Grid.neighbors4, so the index of a direction is also the index
+# of its offset
+possible_directions = ["^", ">", "v", "<"]
 
-def print_board(board: list[list[str]]):
-    for row in board:
-        print("".join(row))
 
+def parse_file(filename: str) -> Grid:
+    return Grid.from_file(filename)
 
-def solve_part1(board_original: list[list[str]]) -> int:
-    board = deepcopy(board_original)
-    rows = len(board)
-    cols = len(board[0])
-    possible_directions = ["^", ">", "v", "<"]
 
-    def walk(start: tuple[int,int]) -> tuple[tuple[int,int], list[tuple[int,int]], bool]:
-        """
-        Walk until an obstruction #.
-        Return:
-            new position
-            path
-            still within the board
-        """
-        r, c = start
-        guard = board[r][c]
-
-        # Direction is specified as (direction_rows, direction_cols) where
-        # each element would be added to the current position to walk one cell
-        direction = (None, None)
-        if guard == "^":
-            direction = (-1, 0)
-        elif guard == ">":
-            direction = (0, 1)
-        elif guard == "v":
-            direction = (1, 0)
-        elif guard == "<":
-            direction = (0, -1)
-        else:
-            raise ValueError(f"Guard direction '{guard}' is invalid")
-
-        def within(row: int, col: int) -> bool:
-            return 0 <= row < rows and 0 <= col < cols
-
-        move_path = []
-        still_within = False
-        while (still_within := within(r, c)) and board[r][c] != "#":
-            r += direction[0]
-            c += direction[1]
-            move_path.append((r, c))
-
-        # Substract once because r,c will be ON the # cell when the loop exits
-        r -= direction[0]
-        c -= direction[1]
-        move_path.pop()
-
-        return (r, c), move_path, still_within
-
-    # find initial position
-    guard_pos = (-1, -1)  # (row, col)
-    guard_direction = -1  # index into possible_positions
-    for r in range(rows):
-        for c in range(cols):
-            if board[r][c] in possible_directions:
-                guard_pos = (r, c)
-                guard_direction = possible_directions.index(board[r][c])
-                break
-
-    unique_cells = set()
-    still_within = True
-    while still_within:
-        new_guard_pos, move_path, still_within = walk(guard_pos)
-        unique_cells.update(move_path)
-
-        # Set old position
-        r, c = guard_pos
-        board[r][c] = "."
-
-        guard_direction = (guard_direction + 1) % len(possible_directions)
-        r, c = new_guard_pos
-        board[r][c] = possible_directions[guard_direction]
-        guard_pos = new_guard_pos
-
-    return len(unique_cells)
-
-
-def solve_part2(board_original: list[list[str]]) -> int:
-    rows = len(board_original)
-    cols = len(board_original[0])
-    possible_directions = ["^", ">", "v", "<"]
-
-    def walk(board: list[list[str]], start: tuple[int,int]
-        ) -> tuple[tuple[int,int], list[tuple[int,int,int]], bool]:
-        """
-        Walk until an obstruction #.
-        Return:
-            new position
-            path
-            still within the board
-        """
-        r, c = start
-        guard = board[r][c]
-
-        def print(*args):
-            pass
-
-        print("guard init pos", r, c)
-
-        # Direction is specified as (direction_rows, direction_cols) where
-        # each element would be added to the current position to walk one cell
-        direction = (None, None)
-        if guard == "^":
-            direction = (-1, 0)
-        elif guard == ">":
-            direction = (0, 1)
-        elif guard == "v":
-            direction = (1, 0)
-        elif guard == "<":
-            direction = (0, -1)
-        else:
-            raise ValueError(f"Guard direction '{guard}' is invalid")
+def print_board(board: Grid):
+    print(board)
+
+
+def find_guard(board: Grid) -> tuple[int,int]:
+    """
+    Return:
+        guard position as a flat index
+        guard direction as an index into possible_directions
+    """
+    for guard_direction, guard in enumerate(possible_directions):
+        guard_pos = board.find(guard)
+        if guard_pos != -1:
+            return guard_pos, guard_direction
+
+    raise ValueError("Board has no guard")
+
 
-        print("direction", direction)
+def walk(board: Grid, start: int) -> tuple[int,list[int],bool]:
+    """
+    Walk until an obstruction #.
+    Return:
+        new position
+        path
+        still within the board
+    """
+    i = start
+    guard = chr(board[i])
+    if guard not in possible_directions:
+        raise ValueError(f"Guard direction '{guard}' is invalid")
 
-        def within(row: int, col: int) -> bool:
-            return 0 <= row < rows and 0 <= col < cols
+    # Offset that is added to the current position to walk one cell
+    direction = board.neighbors4[possible_directions.index(guard)]
 
-        move_path = []
-        still_within = False
-        while (still_within := within(r, c)) and board[r][c] != "#":
-            r += direction[0]
-            c += direction[1]
-            move_path.append((r, c, possible_directions.index(guard)))
-            print("move", r, c, "pathlen", len(move_path), "within", still_within)
+    move_path = []
+    still_within = False
+    while (still_within := board.inside(i)) and board[i] != OBSTACLE:
+        i += direction
+        move_path.append(i)
 
-        # Substract once because r,c will be ON the # cell when the loop exits
-        r -= direction[0]
-        c -= direction[1]
-        move_path.pop()
+    # Substract once because i will be ON the # cell when the loop exits
+    i -= direction
+    move_path.pop()
 
-        print("final pos", r, c, "pathlen", len(move_path), "within", still_within)
-        return (r, c), move_path, still_within
+    return i, move_path, still_within
 
 
-    def test_loop(board: list[list[str]], 
-                  guard_pos: tuple[int,int], 
-                  guard_direction: int
-        ) -> bool:
+def solve_part1(board_original: Grid) -> int:
+    # Every cell on the route except the start is a candidate for part 2
+    return len(path_candidates(board_original)) + 1
+
+
+def solve_part2_brute(board_original: Grid) -> int:
+
+    def test_loop(board: Grid, guard_pos: int, guard_direction: int) -> bool:
         """Returns True if the guard loops, False otherwise."""
         path = set()
         still_within = True
+        turns_in_place = 0
         while still_within:
             new_guard_pos, move_path, still_within = walk(board, guard_pos)
+
+            # Blocked on every side, the guard turns in place forever. Leaving
+            # the board also ends with an empty path, but isn't a turn.
+            turns_in_place = 0 if move_path else turns_in_place + 1
+            if turns_in_place == 4 and still_within:
+                return True
+
             for m in move_path:
-                if m in path:
+                if (m, guard_direction) in path:
                     return True
 
-            path.update(move_path)
+            path.update((m, guard_direction) for m in move_path)
 
             # Set old position
-            r, c = guard_pos
-            board[r][c] = "."
+            board[guard_pos] = EMPTY
 
             # Set new position and direction
             guard_direction = (guard_direction + 1) % len(possible_directions)
-            r, c = new_guard_pos
-            board[r][c] = possible_directions[guard_direction]
+            board[new_guard_pos] = ord(possible_directions[guard_direction])
             guard_pos = new_guard_pos
 
-            # print_board(board)
-
         return False
 
 
-    # find initial position
-    guard_pos = (-1, -1)  # (row, col)
-    guard_direction = -1  # index into possible_positions
-    for r in range(rows):
-        for c in range(cols):
-            if board_original[r][c] in possible_directions:
-                guard_pos = (r, c)
-                guard_direction = possible_directions.index(board_original[r][c])
-                break
+    guard_pos, guard_direction = find_guard(board_original)
 
     # Brute-force search for possible obstacle placements which is wildly 
-    # inefficient.
-    # Improvement ideas:
-    # 1) It looks like obstacles only should be placed where the guard turns. 
-    #    Only testing those positions would greatly reduce the search space.
+    # inefficient, see solve_part2_path.
     loop_count = 0
-    for r in range(rows):
-        for c in range(cols):
-            board = deepcopy(board_original)
-            if board[r][c] != ".":
-                continue
+    for i in board_original.indices():
+        if board_original[i] != EMPTY:
+            continue
+
+        board = board_original.copy()
+        board[i] = OBSTACLE
+        if test_loop(board, guard_pos, guard_direction):
+            loop_count += 1
+
+    return loop_count
+
 
-            board[r][c] = "#"
-            if test_loop(board, guard_pos, guard_direction):
-                loop_count += 1
+def path_candidates(board: Grid) -> list[tuple[int,int,int]]:
+    """
+    Walks the guard's original route. An obstacle can only change the route
+    if it's placed on it, and the route is the same as the original up to the
+    first time the guard enters the obstacle's cell.
+    Return:
+        (cell, position, direction) for every cell on the route except the
+        start, where the guard is at position facing direction just before
+        it first enters cell
+    """
+    cells = board.cells
+    offsets = board.neighbors4
+    guard_pos, guard_direction = find_guard(board)
+
+    # A bit per direction the guard has walked each cell in
+    seen = bytearray(len(cells))
+    seen[guard_pos] = 1 << guard_direction
+    candidates = []
+
+    i, d = guard_pos, guard_direction
+    turns = 0
+    while True:
+        j = i + offsets[d]
+        cell = cells[j]
+        if cell == OBSTACLE:
+            # Blocked on every side, the guard turns in place forever
+            turns += 1
+            if turns == 4:
+                raise ValueError("The guard never leaves the board")
+            d = (d + 1) % 4
+            continue
+        if cell == 0:
+            return candidates
+
+        turns = 0
+        if not seen[j]:
+            candidates.append((j, i, d))
+        elif seen[j] & (1 << d):
+            raise ValueError("The guard never leaves the board")
+        seen[j] |= 1 << d
+        i = j
+
+
+class StepEngine:
+    """
+    Tests one obstacle at a time by walking the guard cell by cell on the
+    board with the obstacle set. Visited (position, direction) states are
+    bits in a bytearray with one byte per cell, which is reused for every
+    trial and cleared with a memset instead of a new allocation.
+    """
+
+    def __init__(self, board: Grid):
+        self.board = board.copy()
+        self.visited = bytearray(len(self.board.cells))
+        self.cleared = bytes(len(self.board.cells))
+
+    def __repr__(self) -> str:
+        return f"StepEngine({self.board!r})"
+
+    def loops(self, cell: int, i: int, d: int) -> bool:
+        """
+        Returns True if the guard loops with an obstacle at cell, starting at
+        position i facing direction d.
+        """
+        cells = self.board.cells
+        cells[cell] = OBSTACLE
+        try:
+            return self._walk(i, d)
+        finally:
+            cells[cell] = EMPTY
+            self.visited[:] = self.cleared
+
+    def _walk(self, i: int, d: int) -> bool:
+        cells = self.board.cells
+        offsets = self.board.neighbors4
+        visited = self.visited
+        turns = 0
+        while True:
+            j = i + offsets[d]
+            cell = cells[j]
+            if cell == OBSTACLE:
+                # Blocked on every side, the guard turns in place forever
+                turns += 1
+                if turns == 4:
+                    return True
+                d = (d + 1) % 4
+                continue
+            if cell == 0:
+                return False
+
+            turns = 0
+            i = j
+            bit = 1 << d
+            if visited[i] & bit:
+                return True
+            visited[i] |= bit
+
+
+class ObstacleIndex:
+    """
+    Sorted obstacle columns for every row and obstacle rows for every
+    column, so a leg of the walk is a binary search instead of a step per
+    cell. One extra obstacle can be laid over the map without changing the
+    index.
+    """
+
+    def __init__(self, board: Grid):
+        self.rows = board.rows
+        self.cols = board.cols
+        self.in_row: list[list[int]] = [[] for _ in range(board.rows)]
+        self.in_col: list[list[int]] = [[] for _ in range(board.cols)]
+        self.extra: tuple[int,int] | None = None
+
+        # Row-major order, so both lists come out sorted
+        for i in board.indices():
+            if board[i] == OBSTACLE:
+                r, c = board.position(i)
+                self.in_row[r].append(c)
+                self.in_col[c].append(r)
+
+    def __repr__(self) -> str:
+        return f"ObstacleIndex(rows={self.rows}, cols={self.cols}, extra={self.extra})"
+
+    def leg(self, r: int, c: int, d: int) -> tuple[int,int] | None:
+        """
+        Walk from (r, c) in direction d (an index into possible_directions)
+        until the next cell is an obstacle.
+        Return:
+            the position the guard stops at, None if it leaves the map
+        """
+        er, ec = self.extra if self.extra is not None else (-2, -2)
+
+        if d == 0:
+            col = self.in_col[c]
+            k = bisect_left(col, r)
+            stop = col[k - 1] if k > 0 else -1
+            if ec == c and stop < er < r:
+                stop = er
+            return (stop + 1, c) if stop != -1 else None
+        elif d == 1:
+            row = self.in_row[r]
+            k = bisect_right(row, c)
+            stop = row[k] if k < len(row) else self.cols
+            if er == r and c < ec < stop:
+                stop = ec
+            return (r, stop - 1) if stop != self.cols else None
+        elif d == 2:
+            col = self.in_col[c]
+            k = bisect_right(col, r)
+            stop = col[k] if k < len(col) else self.rows
+            if ec == c and r < er < stop:
+                stop = er
+            return (stop - 1, c) if stop != self.rows else None
+        else:
+            row = self.in_row[r]
+            k = bisect_left(row, c)
+            stop = row[k - 1] if k > 0 else -1
+            if er == r and stop < ec < c:
+                stop = ec
+            return (r, stop + 1) if stop != -1 else None
+
+
+class JumpEngine:
+    """
+    Tests one obstacle at a time by jumping the guard from turn to turn.
+    States are encoded as (r * cols + c) * 4 + direction, meaning the guard
+    is at (r, c) about to walk in direction. jumps maps a state to the state
+    after the next leg and turn on the unmodified map (-1 if the guard leaves
+    it), and is precomputed for every cell in front of an obstacle. Only legs
+    in the row or column of the extra obstacle are searched in the index.
+
+    Loops are detected on the turn states only, since a loop always has to
+    turn.
+    """
+
+    def __init__(self, board: Grid):
+        self.board = board
+        self.cols = board.cols
+        self.index = ObstacleIndex(board)
+        self.jumps: dict[int,int] = {}
+
+        for r, obstacles in enumerate(self.index.in_row):
+            for c in obstacles:
+                for d, (dr, dc) in enumerate([(-1, 0), (0, 1), (1, 0), (0, -1)]):
+                    # Standing in front of the obstacle, facing it, so the
+                    # guard turns to the next direction
+                    rr, cc = r - dr, c - dc
+                    if board.within(rr, cc) and board.at(rr, cc) != "#":
+                        state = self.encode(rr, cc, (d + 1) % 4)
+                        self.jumps[state] = self.next_state(rr, cc, (d + 1) % 4)
+
+    def __repr__(self) -> str:
+        return f"JumpEngine({self.board!r}, jumps={len(self.jumps)})"
+
+    def encode(self, r: int, c: int, d: int) -> int:
+        return (r * self.cols + c) * 4 + d
+
+    def next_state(self, r: int, c: int, d: int) -> int:
+        stop = self.index.leg(r, c, d)
+        if stop is None:
+            return -1
+        return self.encode(stop[0], stop[1], (d + 1) % 4)
+
+    def loops(self, cell: int, i: int, d: int) -> bool:
+        """
+        Returns True if the guard loops with an obstacle at cell, starting at
+        position i facing direction d.
+        """
+        er, ec = self.board.position(cell)
+        r, c = self.board.position(i)
+
+        self.index.extra = (er, ec)
+        try:
+            return self._walk(self.encode(r, c, d), er, ec)
+        finally:
+            self.index.extra = None
+
+    def _walk(self, state: int, er: int, ec: int) -> bool:
+        cols = self.cols
+        jumps = self.jumps
+        seen = set()
+        while True:
+            position, d = divmod(state, 4)
+            r, c = divmod(position, cols)
+
+            if (d % 2 == 0 and c == ec) or (d % 2 == 1 and r == er):
+                # The extra obstacle may be on this leg
+                state = self.next_state(r, c, d)
+            elif state in jumps:
+                state = jumps[state]
+            else:
+                # A leg that doesn't start at a turn (the first one), which
+                # doesn't touch the extra obstacle so it can be stored
+                jumps[state] = self.next_state(r, c, d)
+                state = jumps[state]
+
+            if state == -1:
+                return False
+            if state in seen:
+                return True
+            seen.add(state)
+
+
+def count_loops(engine: StepEngine | JumpEngine, candidates: list[tuple[int,int,int]]) -> int:
+    loop_count = 0
+    for cell, i, d in candidates:
+        if engine.loops(cell, i, d):
+            loop_count += 1
 
     return loop_count
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
+def solve_part2_path(board_original: Grid) -> int:
+    return count_loops(StepEngine(board_original), path_candidates(board_original))
+
+
+def solve_part2_jump(board_original: Grid) -> int:
+    return count_loops(JumpEngine(board_original), path_candidates(board_original))
+
+
+# The engine of a pool worker, built once by init_worker so the board is sent
+# to each worker once instead of with every task
+_worker_engine: StepEngine | JumpEngine | None = None
+
+
+def init_worker(engine_type: type, board: Grid):
+    global _worker_engine
+    _worker_engine = engine_type(board)
+
+
+def count_loops_in_worker(candidates: list[tuple[int,int,int]]) -> int:
+    assert _worker_engine is not None, "init_worker has not been run"
+    return count_loops(_worker_engine, candidates)
+
+
+def solve_part2_parallel(board_original: Grid,
+                         engine_type: type = JumpEngine,
+                         jobs: int | None = None) -> int:
+    """
+    Tests the candidates in a process pool with jobs workers (default: one
+    per cpu). Every trial is independent, so the candidates are split in
+    shards and the loop counts of the shards are added up. The shards take
+    every n-th candidate so the long and short trials are spread evenly.
+    Any engine with a loops(cell, i, d) method and a constructor taking the
+    board works.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    candidates = path_candidates(board_original)
+    shards = [candidates[k::jobs * 4] for k in range(jobs * 4)]
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(engine_type, board_original)) as executor:
+        return sum(executor.map(count_loops_in_worker, shards))
+
+
+def solve_part2(board_original: Grid) -> int:
+    # return solve_part2_brute(board_original)
+    # return solve_part2_path(board_original)
+    # return solve_part2_parallel(board_original)
+    return solve_part2_jump(board_original)
+
 
-puzzle_input = parse_file(sys.argv[1])
-print_board(puzzle_input)
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-sol1 = solve_part1(puzzle_input)
-print("part1:", sol1)
+    puzzle_input = parse_file(sys.argv[1])
+    print_board(puzzle_input)
 
-sol2 = solve_part2(puzzle_input)
-print("part2:", sol2)
+    sol1 = solve_part1(puzzle_input)
+    print("part1:", sol1)
 
+    sol2 = solve_part2(puzzle_input)
+    print("part2:", sol2)
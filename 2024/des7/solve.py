@@ -1,22 +1,25 @@
 import sys
 import itertools
 import time
+from typing import Iterable, Iterator
 
-def parse_file(filename: str) -> list[tuple[int,list[int]]]:
+def iter_file(filename: str) -> Iterator[tuple[int,list[int]]]:
+    """Yields the equations one line at a time."""
     with open(filename) as fp:
-        lines = fp.readlines()
+        for line in fp:
+            if not line.strip():
+                continue
 
-    equations = []
-    for line in lines:
-        result, rest = line.split(":")
-        numbers = [int(d.strip()) for d in rest.strip().split(" ")]
+            result, rest = line.split(":")
+            numbers = [int(d.strip()) for d in rest.strip().split(" ")]
+            yield int(result), numbers
 
-        equations.append((int(result), numbers))
 
-    return equations
+def parse_file(filename: str) -> list[tuple[int,list[int]]]:
+    return list(iter_file(filename))
 
 
-def test_possible(result: int, numbers: list[int], operators: list[str]) -> bool:
+def test_possible_brute(result: int, numbers: list[int], operators: list[str]) -> bool:
     holes = len(numbers) - 1
     perms = itertools.product(operators, repeat=holes)
 
@@ -38,41 +41,114 @@ def test_possible(result: int, numbers: list[int], operators: list[str]) -> bool
     return False
 
 
-def solve_part1(puzzle_input: list[tuple[int,list[int]]]) -> int:
+# Returned by an undo when any left operand gives the result. Values are never
+# negative, so this can't be a real target.
+ANY = -1
+
+
+def undo_add(result: int, number: int) -> int | None:
+    if result < number:
+        return None
+    return result - number
+
+
+def undo_multiply(result: int, number: int) -> int | None:
+    if number == 0:
+        # Anything times 0 is 0
+        return ANY if result == 0 else None
+    if result % number != 0:
+        return None
+    return result // number
+
+
+def undo_concatenate(result: int, number: int) -> int | None:
+    # a || b = a * 10^(digits in b) + b, so b must be the last digits of the
+    # result and a is what is left in front of them. a can be 0, as 0 || b
+    # is just b.
+    power = 10
+    while power <= number:
+        power *= 10
+
+    if result % power != number:
+        return None
+    return result // power
+
+
+# Each operator's inverse: what the left operand must have been to give the
+# result with the right operand, ANY if every left operand does, or None if
+# no left operand can
+UNDO = {
+    "+": undo_add,
+    "*": undo_multiply,
+    "||": undo_concatenate,
+}
+
+
+def can_make(result: int, numbers: list[int], operators: list[str]) -> bool:
+    """
+    Works backwards from the result: the last operator applied the last
+    number, so undoing it gives the value the numbers before it must make.
+    Undoing fails right away for most operators (the division isn't exact,
+    the digits don't match), which prunes those branches before they are
+    expanded. The numbers before a number that can be undone to ANY (a
+    multiplication by 0) always make some value, so the result can be made.
+    Assumes the numbers aren't negative.
+    """
+    undos = [UNDO[op] for op in operators]
+
+    stack = [(result, len(numbers) - 1)]
+    while stack:
+        target, k = stack.pop()
+        if k == 0:
+            if target == numbers[0]:
+                return True
+            continue
+
+        for undo in undos:
+            previous = undo(target, numbers[k])
+            if previous == ANY:
+                return True
+            if previous is not None:
+                stack.append((previous, k - 1))
+
+    return False
+
+
+def solve_part1(puzzle_input: Iterable[tuple[int,list[int]]]) -> int:
     operators = ["+", "*"]
 
     total_sum = 0
     for result, numbers in puzzle_input:
-        if test_possible(result, numbers, operators):
+        if can_make(result, numbers, operators):
             total_sum += result
 
     return total_sum
 
 
-def solve_part2(puzzle_input: list[tuple[int,list[int]]]) -> int:
+def solve_part2(puzzle_input: Iterable[tuple[int,list[int]]]) -> int:
     operators = ["+", "*", "||"]
 
     total_sum = 0
     for result, numbers in puzzle_input:
-        if test_possible(result, numbers, operators):
+        if can_make(result, numbers, operators):
             total_sum += result
 
     return total_sum
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
-
-puzzle_input = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-t0 = time.time()
-sol1 = solve_part1(puzzle_input)
-t1 = time.time()
-print("part1:", sol1, f"{t1-t0:.4f}s")
+    puzzle_input = parse_file(sys.argv[1])
 
-t0 = time.time()
-sol2 = solve_part2(puzzle_input)
-t1 = time.time()
-print("part2:", sol2, f"{t1-t0:.4f}s")
+    t0 = time.time()
+    sol1 = solve_part1(puzzle_input)
+    t1 = time.time()
+    print("part1:", sol1, f"{t1-t0:.4f}s")
 
+    t0 = time.time()
+    sol2 = solve_part2(puzzle_input)
+    t1 = time.time()
+    print("part2:", sol2, f"{t1-t0:.4f}s")
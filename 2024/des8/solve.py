@@ -1,13 +1,23 @@
 import sys
 import itertools
-from copy import deepcopy
+from pathlib import Path
 
-def parse_file(filename: str) -> list[list[str]]:
-    with open(filename) as fp:
-        lines = fp.readlines()
+# Make the shared aoc package importable when running this file as a script
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from aoc.grid import Grid
 
-    board = [list(line.strip()) for line in lines]
-    return board
+def parse_file(filename: str) -> Grid:
+    return Grid.from_file(filename)
+
+
+def find_frequencies(puzzle_map: Grid) -> dict[str,list[tuple[int,int]]]:
+    frequencies = {}
+    for i in puzzle_map.indices():
+        f = chr(puzzle_map[i])
+        if f not in ["."]:
+            frequencies[f] = frequencies.get(f, []) + [puzzle_map.position(i)]
+
+    return frequencies
 
 
 def vector_add(v1: tuple[int,int], v2: tuple[int,int]) -> tuple[int,int]:
@@ -31,17 +41,11 @@ def vector_mul(v: tuple[int,int], s: int) -> tuple[int,int]:
     )
 
 
-def solve_part1(puzzle_input: list[list[str]]) -> int:
-    puzzle_map = deepcopy(puzzle_input)
-    rows = len(puzzle_map)
-    cols = len(puzzle_map[0])
+def solve_part1(puzzle_input: Grid) -> int:
+    puzzle_map = puzzle_input.copy()
+    within = puzzle_map.within
 
-    frequencies = {}
-    for r in range(rows):
-        for c in range(cols):
-            f = puzzle_map[r][c]
-            if f not in ["."]:
-                frequencies[f] = frequencies.get(f, []) + [(r, c)]
+    frequencies = find_frequencies(puzzle_map)
 
     valid_anitnodes = set()
     for freq, poles in frequencies.items():
@@ -59,7 +63,7 @@ def solve_part1(puzzle_input: list[list[str]]) -> int:
             antinodes.add(anti2)
 
         for r, c in antinodes:
-            if r >= rows or r < 0 or c >= cols or c < 0:
+            if not within(r, c):
                 continue
 
             # We count all antinodes within the bounds of the map, even if it
@@ -67,32 +71,22 @@ def solve_part1(puzzle_input: list[list[str]]) -> int:
             valid_anitnodes.add((r, c))
 
             # But we only visualize the ones that don't overlap
-            if puzzle_map[r][c] != ".":
+            if puzzle_map.at(r, c) != ".":
                 continue
 
-            puzzle_map[r][c] = "#"
+            puzzle_map.set(r, c, "#")
 
     print("Part 1 antinodes:")
-    for row in puzzle_map:
-        print("".join(row))
+    print(puzzle_map)
 
     return len(valid_anitnodes)
 
 
-def solve_part2(puzzle_input: list[list[str]]) -> int:
-    puzzle_map = deepcopy(puzzle_input)
-    rows = len(puzzle_map)
-    cols = len(puzzle_map[0])
-
-    def within(row: int, col: int) -> bool:
-        return row < rows and row >= 0 and col < cols and col >= 0
+def solve_part2(puzzle_input: Grid) -> int:
+    puzzle_map = puzzle_input.copy()
+    within = puzzle_map.within
 
-    frequencies = {}
-    for r in range(rows):
-        for c in range(cols):
-            f = puzzle_map[r][c]
-            if f not in ["."]:
-                frequencies[f] = frequencies.get(f, []) + [(r, c)]
+    frequencies = find_frequencies(puzzle_map)
 
     valid_anitnodes = set()
     for freq, poles in frequencies.items():
@@ -129,30 +123,28 @@ def solve_part2(puzzle_input: list[list[str]]) -> int:
             valid_anitnodes.add((r, c))
 
             # But we only visualize the ones that don't overlap
-            if puzzle_map[r][c] != ".":
+            if puzzle_map.at(r, c) != ".":
                 continue
 
-            puzzle_map[r][c] = "#"
+            puzzle_map.set(r, c, "#")
 
     print("Part 2 antinodes:")
-    for row in puzzle_map:
-        print("".join(row))
+    print(puzzle_map)
 
     return len(valid_anitnodes)
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
-
-puzzle_input = parse_file(sys.argv[1])
-print("Input:")
-for row in puzzle_input:
-    print("".join(row))
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-sol1 = solve_part1(puzzle_input)
-print("part1:", sol1)
+    puzzle_input = parse_file(sys.argv[1])
+    print("Input:")
+    print(puzzle_input)
 
-sol2 = solve_part2(puzzle_input)
-print("part2:", sol2)
+    sol1 = solve_part1(puzzle_input)
+    print("part1:", sol1)
 
+    sol2 = solve_part2(puzzle_input)
+    print("part2:", sol2)
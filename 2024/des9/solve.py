@@ -1,4 +1,5 @@
 import sys
+import heapq
 import itertools
 import time
 
@@ -7,7 +8,11 @@ FREE_SPACE_ID = None
 def parse_file(filename: str) -> list[int]:
     with open(filename) as fp:
         disk_map = [int(d) for d in fp.read().strip()]
-    
+
+    return disk_map
+
+
+def expand(disk_map: list[int]) -> list[int]:
     # Expand disk map to memory map
     memory_map = []
     id_counter = itertools.count()
@@ -34,8 +39,53 @@ def checksum(memory_map: list[int]) -> int:
     return cc
 
 
-def solve_part1(memory_map: list[int]) -> int:
-    rearranged = memory_map.copy()
+def span_checksum(file_id: int, start: int, size: int) -> int:
+    # Sum of file_id * position over start, ..., start + size - 1
+    return file_id * (start * size + size * (size - 1) // 2)
+
+
+def solve_part1(disk_map: list[int]) -> int:
+    """
+    Two pointers over the runs of the disk map: left walks forward over
+    files, which stay where they are, and free spans, which are filled with
+    blocks from the file right points to, walking backwards. Each piece of a
+    file that is placed adds its checksum in one go.
+    """
+    left, right = 0, len(disk_map) - 1
+    if right % 2 == 1:
+        # Ends with free space
+        right -= 1
+    remaining = disk_map[right]
+
+    position = 0
+    total = 0
+    while left < right:
+        size = disk_map[left]
+        if left % 2 == 0:
+            total += span_checksum(left // 2, position, size)
+            position += size
+        else:
+            while size > 0 and left < right:
+                moved = min(size, remaining)
+                total += span_checksum(right // 2, position, moved)
+                position += moved
+                size -= moved
+                remaining -= moved
+
+                if remaining == 0:
+                    right -= 2
+                    remaining = disk_map[right] if right > left else 0
+        left += 1
+
+    if left == right:
+        # What is left of the last file that was partly moved
+        total += span_checksum(right // 2, position, remaining)
+
+    return total
+
+
+def solve_part1_blocks(disk_map: list[int]) -> int:
+    rearranged = expand(disk_map)
 
     # Rearrange blocks to beginning of memory map
     def find_backward(idx: int) -> int:
@@ -63,8 +113,54 @@ def solve_part1(memory_map: list[int]) -> int:
     return checksum(rearranged)
 
 
-def solve_part2(memory_map: list[int]) -> int:
-    rearranged = memory_map.copy()
+def solve_part2(disk_map: list[int]) -> int:
+    """
+    Works on (start, size) spans instead of single blocks. free[size] is a
+    min-heap of the starts of the free spans with that size (1-9), so the
+    leftmost span a file fits in is the smallest start among the heaps for
+    its size and up. Files are moved once each, highest id first, and a
+    moved file's old span is to the right of every file left to move, so it
+    never has to be added to the heaps.
+    """
+    starts = []
+    sizes = disk_map[0::2]
+    free: list[list[int]] = [[] for _ in range(10)]
+
+    position = 0
+    for i, size in enumerate(disk_map):
+        if i % 2 == 0:
+            starts.append(position)
+        elif size > 0:
+            free[size].append(position)
+        position += size
+
+    # The starts are appended in increasing order, so they are already heaps
+
+    total = 0
+    for file_id in range(len(starts) - 1, -1, -1):
+        start = starts[file_id]
+        size = sizes[file_id]
+
+        best_size = 0
+        for free_size in range(size, 10):
+            heap = free[free_size]
+            if heap and heap[0] < start:
+                start = heap[0]
+                best_size = free_size
+
+        if best_size > 0:
+            heapq.heappop(free[best_size])
+            left = best_size - size
+            if left > 0:
+                heapq.heappush(free[left], start + size)
+
+        total += span_checksum(file_id, start, size)
+
+    return total
+
+
+def solve_part2_blocks(disk_map: list[int]) -> int:
+    rearranged = expand(disk_map)
 
     def find_block(id: int = -1, *, start: int = len(rearranged) - 1) -> tuple[int,int,int]:
         """
@@ -128,19 +224,19 @@ def solve_part2(memory_map: list[int]) -> int:
     return checksum(rearranged)
 
 
-if len(sys.argv) != 2:
-    print(f"{sys.argv[0]} [input file]")
-    exit(1)
-
-puzzle_input = parse_file(sys.argv[1])
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"{sys.argv[0]} [input file]")
+        exit(1)
 
-t0 = time.time()
-sol1 = solve_part1(puzzle_input)
-t1 = time.time()
-print("part1:", sol1, f"(time elpased {t1 - t0:.4f}s)")
+    puzzle_input = parse_file(sys.argv[1])
 
-t0 = time.time()
-sol2 = solve_part2(puzzle_input)
-t1 = time.time()
-print("part2:", sol2, f"(time elpased {t1 - t0:.4f}s)")
+    t0 = time.time()
+    sol1 = solve_part1(puzzle_input)
+    t1 = time.time()
+    print("part1:", sol1, f"(time elpased {t1 - t0:.4f}s)")
 
+    t0 = time.time()
+    sol2 = solve_part2(puzzle_input)
+    t1 = time.time()
+    print("part2:", sol2, f"(time elpased {t1 - t0:.4f}s)")